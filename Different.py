@@ -5,28 +5,13 @@ import os
 import logging
 from datetime import datetime
 from config import OLLAMA_BASE_URL
+from llm_cache import response_cache_for
+from logger_config import setup_logging
 
-# Set up logging configuration
-log_directory = 'logs'
-os.makedirs(log_directory, exist_ok=True)
+setup_logging()  # Queued, rotating logging to logs/research_summary.log
 
-# Force clear any existing handlers to avoid duplicate logging
-for handler in logging.root.handlers[:]:
-    logging.root.removeHandler(handler)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(log_directory, 'research_summary.log'), mode='a'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
-# Add initial log entry to verify logging is working
-logger.info("Logging system initialized")
-
 # Initialize tools
 search_tool = DuckDuckGoSearchRun()
 
@@ -34,7 +19,8 @@ os.environ["OPENAI_API_KEY"] = "NA"
 
 llm = ChatOpenAI(
     model="deepseek-r1:1.5b",
-    base_url=OLLAMA_BASE_URL
+    base_url=OLLAMA_BASE_URL,
+    cache=response_cache_for("deepseek-r1:1.5b", OLLAMA_BASE_URL)
 )
 
 researcher = Agent(
@@ -4,27 +4,26 @@ import os
 import logging
 from datetime import datetime
 from config import OLLAMA_BASE_URL
+from llm_cache import response_cache_for
+from model_routing import route_for
+from logger_config import setup_logging
 
-# Set up logging configuration
-logging.basicConfig(
-    level=logging.DEBUG,  # Changed to DEBUG to capture more detailed information
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('research_summary.log', mode='a', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+# Set up logging configuration: queued and rotated like the app's, at DEBUG to capture more detailed information
+setup_logging(level=logging.DEBUG, log_file='research_summary.log')
 logger = logging.getLogger(__name__)
 
 os.environ["OPENAI_API_KEY"] = "NA"
 
+MODEL = route_for("writer").served_model
+
 llm = ChatOpenAI(
-    model = "deepseek-r1:32b",
-    base_url = OLLAMA_BASE_URL
+    model = MODEL,
+    base_url = OLLAMA_BASE_URL,
+    cache = response_cache_for(MODEL, OLLAMA_BASE_URL)
 )
 
 # Log LLM initialization
-logger.info("Initializing LLM with model: deepseek-r1:32b")
+logger.info(f"Initializing LLM with model: {MODEL}")
 
 planner = Agent(
     role="Content Planner",
@@ -2,39 +2,70 @@ from crewai import Agent
 from langchain_openai import ChatOpenAI
 from config import OLLAMA_BASE_URL
 from web_search import WebSearchTool  # Import the new tool
+from llm_cache import response_cache_for
+from token_stream import TokenRateHandler, TokenStreamHandler
+from model_routing import route_for
+
+
+def build_llm(role="researcher", stream_tokens=True, http_client=None):
+    """Creates a streaming ChatOpenAI client for the role's routed Ollama model with a persistent response cache.
+
+    Generated tokens are forwarded to whichever run is listening through token_stream,
+    unless ``stream_tokens`` is False (calls made in parallel would interleave),
+    and every call is timed for the metrics. An ``http_client`` (httpx.Client)
+    lets clients built for successive crews reuse its open connections to Ollama.
+    """
+    model = route_for(role).served_model
+    callbacks = [TokenStreamHandler(), TokenRateHandler(model)] if stream_tokens else [TokenRateHandler(model)]
+    return ChatOpenAI(
+        model=model,
+        base_url=OLLAMA_BASE_URL,
+        cache=response_cache_for(model, OLLAMA_BASE_URL),
+        streaming=True,
+        callbacks=callbacks,
+        http_client=http_client
+    )
+
+
+def build_agents(llm=None, search_tool=None, http_client=None):
+    """Creates a fresh researcher, analyst and summarizer.
+
+    Each agent gets a client for its routed model, sending its requests through
+    ``http_client`` when given, unless ``llm`` is given, in which case all
+    three share it.
+    """
+    search_tool = search_tool or WebSearchTool()
+
+    researcher = Agent(
+        role="Research Analyst",
+        goal="Gather and verify comprehensive, relevant, and up-to-date information on {topic}.",
+        backstory="You are a research analyst skilled in finding and validating factual information from multiple sources.",
+        tools=[search_tool],  # Now properly formatted as a CrewAI tool
+        llm=llm or build_llm("researcher", http_client=http_client),
+        verbose=True
+    )
+
+    analyst = Agent(
+        role="Insights Analyst",
+        goal="Analyze and interpret research findings on {topic}.",
+        backstory="You extract key insights from research data and synthesize meaningful conclusions.",
+        llm=llm or build_llm("analyst", http_client=http_client),
+        verbose=True
+    )
+
+    summarizer = Agent(
+        role="Knowledge Synthesizer",
+        goal="Create a structured, clear, and well-supported summary of research findings on {topic}.",
+        backstory="You distill complex research into structured summaries with clarity and precision.",
+        llm=llm or build_llm("summarizer", http_client=http_client),
+        verbose=True
+    )
+
+    return researcher, analyst, summarizer
 
-# Initialize LLM
-llm = ChatOpenAI(
-    model="deepseek-r1:1.5b",
-    base_url=OLLAMA_BASE_URL
-)
 
 # Initialize web search tool
 web_search_tool = WebSearchTool()
 
-# Define agents
-
-researcher = Agent(
-    role="Research Analyst",
-    goal="Gather and verify comprehensive, relevant, and up-to-date information on {topic}.",
-    backstory="You are a research analyst skilled in finding and validating factual information from multiple sources.",
-    tools=[web_search_tool],  # Now properly formatted as a CrewAI tool
-    llm=llm,
-    verbose=True
-)
-
-analyst = Agent(
-    role="Insights Analyst",
-    goal="Analyze and interpret research findings on {topic}.",
-    backstory="You extract key insights from research data and synthesize meaningful conclusions.",
-    llm=llm,
-    verbose=True
-)
-
-summarizer = Agent(
-    role="Knowledge Synthesizer",
-    goal="Create a structured, clear, and well-supported summary of research findings on {topic}.",
-    backstory="You distill complex research into structured summaries with clarity and precision.",
-    llm=llm,
-    verbose=True
-)
\ No newline at end of file
+# Define agents, each on its routed model
+researcher, analyst, summarizer = build_agents(search_tool=web_search_tool)
@@ -1,82 +1,164 @@
-import os
-from datetime import datetime
-from flask import Flask, request, jsonify
+import json
+import threading
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-from crewai import Crew
-from tasks import research, analyze, summarize
-from agents import researcher, analyst, summarizer
-from logger_config import logger
-from web_search import search_and_extract
+from model_routing import WARM_ON_STARTUP, prepare_models_in_background
+from jobs import JOB_WORKERS, JobManager, QueueFull, sse_stream
+from crew_factory import CREW_POOL_PROCESSES
+from research_pipeline import BATCH_LLM_CONCURRENCY, BATCH_MAX_TOPICS, run_batch
+from research_runner import execute_research
+from metrics import render_metrics
+from logger_config import setup_logging
+
+setup_logging()  # This process owns the log file; crew workers send their records here
 
 app = Flask(__name__)
 CORS(app)  # Enable Cross-Origin Resource Sharing
 
-# Initialize Crew with agents and tasks
-crew = Crew(
-    agents=[researcher, analyst, summarizer],
-    tasks=[research, analyze, summarize],
-    verbose=2
-)
 
-def run_research(topic):
-    """Runs the research process and returns results."""
-    inputs = {"topic": topic}
+@app.route('/run_research', methods=['POST'])
+def run_research_route():
+    """API endpoint for running research."""
+    data = request.get_json()
 
-    # Debugging: Test the search tool separately before running CrewAI
-    logger.info(f"🧪 Testing WebSearchTool separately for topic: {topic}")
-    print(f"🧪 Running test search for: {topic}")
+    if not data or 'topic' not in data:
+        return jsonify({"status": "error", "error": "Missing topic"}), 400
 
-    test_results = search_and_extract(topic, num_results=3)  # Test with 3 results
-    if not test_results:
-        logger.error("❌ Search tool returned no results!")
-        print("❌ Search tool returned no results!")
-        return {"status": "error", "error": "Search tool did not return any results"}
+    topic = data['topic']
+    try:
+        job = job_manager.submit(topic, refresh=bool(data.get('refresh')))
+    except QueueFull as e:
+        return jsonify({"status": "error", "error": f"Research queue is full: {e}"}), 429
 
-    logger.info("✅ Search tool test successful!")
-    print(f"✅ Search Tool Results:\n{test_results}")
+    job.wait()
+    return jsonify(job.result or {"status": "error", "error": job.error})
 
-    try:
-        logger.info(f"🚀 Starting CrewAI research for: {topic}")
-        print(f"🚀 Running research pipeline for: {topic}")
 
-        result = crew.kickoff(inputs=inputs)
+# Research runs, each on its own crew, either on worker threads or the crew process pool
+job_manager = JobManager(execute_research, workers=CREW_POOL_PROCESSES or JOB_WORKERS)
 
-        os.makedirs('research_outputs', exist_ok=True)  # Ensure output directory exists
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_file = f'research_outputs/research_summary_{timestamp}.md'
+# One batch at a time; its crews also wait for the crew slots queued jobs use
+_batch_running = threading.BoundedSemaphore(1)
 
-        # Extract only the "Final Answer" if the result is structured
-        if isinstance(result, dict) and "Final Answer" in result:
-            result_text = result["Final Answer"]
-        else:
-            result_text = str(result)
+# Preload the routed models so the first request does not wait for Ollama to load them
+if WARM_ON_STARTUP:
+    prepare_models_in_background()
 
-        # Save research summary to a file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(result_text)
 
-        logger.info(f"✅ Research summary saved: {output_file}")
-        print(f"✅ Research summary saved: {output_file}")
+@app.route('/jobs', methods=['POST'])
+def submit_job_route():
+    """Queues a research run and returns its job ID without waiting for it."""
+    data = request.get_json()
 
-        return {"status": "success", "rawOutput": result_text, "outputFile": output_file}
+    if not data or 'topic' not in data:
+        return jsonify({"status": "error", "error": "Missing topic"}), 400
 
-    except Exception as e:
-        logger.error(f"❌ Error during execution: {e}", exc_info=True)
-        print(f"❌ Error: {e}")
-        return {"status": "error", "error": str(e)}
+    try:
+        job = job_manager.submit(data['topic'], refresh=bool(data.get('refresh')))
+    except QueueFull as e:
+        return jsonify({"status": "error", "error": f"Research queue is full: {e}"}), 429
 
+    return jsonify(job.to_dict()), 202
 
-@app.route('/run_research', methods=['POST'])
-def run_research_route():
-    """API endpoint for running research."""
+
+@app.route('/run_research/stream', methods=['POST'])
+def run_research_stream_route():
+    """Runs research and streams its stages and generated tokens as Server-Sent Events.
+
+    The final ``done`` event carries the same result as ``/run_research``.
+    """
     data = request.get_json()
 
     if not data or 'topic' not in data:
         return jsonify({"status": "error", "error": "Missing topic"}), 400
 
-    topic = data['topic']
-    result = run_research(topic)
-    return jsonify(result)
+    try:
+        job = job_manager.submit(data['topic'], refresh=bool(data.get('refresh')))
+    except QueueFull as e:
+        return jsonify({"status": "error", "error": f"Research queue is full: {e}"}), 429
+
+    return _event_stream_response(job)
+
+
+@app.route('/run_research/batch', methods=['POST'])
+def run_research_batch_route():
+    """Researches a list of topics and streams one JSON line per topic as each finishes.
+
+    The topics share one store of searches and fetched pages, and at most
+    ``concurrency`` (default BATCH_LLM_CONCURRENCY) crews run at once. Batch
+    crews take the same crew slots as queued jobs, and a batch is refused with
+    429 while another one is running.
+    """
+    data = request.get_json()
+
+    topics = data.get('topics') if data else None
+    if not isinstance(topics, list) or not topics or not all(isinstance(topic, str) and topic.strip() for topic in topics):
+        return jsonify({"status": "error", "error": "Missing topics"}), 400
+    if len(topics) > BATCH_MAX_TOPICS:
+        return jsonify({"status": "error", "error": f"At most {BATCH_MAX_TOPICS} topics per batch"}), 400
+
+    try:
+        concurrency = int(data.get('concurrency') or BATCH_LLM_CONCURRENCY)
+    except (TypeError, ValueError):
+        return jsonify({"status": "error", "error": "concurrency must be a number"}), 400
+    if concurrency < 1:
+        return jsonify({"status": "error", "error": "concurrency must be at least 1"}), 400
+
+    if not _batch_running.acquire(blocking=False):
+        return jsonify({"status": "error", "error": "Another batch is running"}), 429
+    results = run_batch(topics, refresh=bool(data.get('refresh')),
+                        llm_concurrency=min(concurrency, BATCH_LLM_CONCURRENCY))
+    response = Response(
+        (json.dumps(result, ensure_ascii=False) + "\n" for result in results),
+        mimetype='application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+    # Also runs when the client disconnects before the batch finishes
+    response.call_on_close(_batch_running.release)
+    return response
+
+
+def _event_stream_response(job):
+    return Response(
+        sse_stream(job),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status_route(job_id):
+    """Reports the status and current stage of a research job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "error": "Unknown job"}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result_route(job_id):
+    """Returns the result of a finished job, or 202 while it is still running."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "error": "Unknown job"}), 404
+    if not job.done:
+        return jsonify(job.to_dict()), 202
+    return jsonify(job.result or {"status": "error", "error": job.error})
+
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events_route(job_id):
+    """Streams stage transitions and partial output of a job as Server-Sent Events."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "error": "Unknown job"}), 404
+    return _event_stream_response(job)
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_route():
+    """Stage timings and LLM generation speed in the Prometheus text format."""
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
 
 
 if __name__ == '__main__':
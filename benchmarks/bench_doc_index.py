@@ -0,0 +1,124 @@
+# benchmarks/bench_doc_index.py
+
+"""Measures DocumentIndex query latency and recall as the corpus grows.
+
+Builds throwaway indexes of synthetic passages and reports add throughput,
+p50/p95 query latency and recall per corpus size as JSON. Recall queries
+are phrases taken from an indexed passage: ``recall_at_k`` counts those
+whose passage is among the top k, ``recall_above_min_score`` those where it
+also scores above the embedder's local-hit threshold, and
+``off_topic_above_min_score`` counts queries of unindexed words that would
+wrongly pass the threshold:
+
+    python benchmarks/bench_doc_index.py
+    python benchmarks/bench_doc_index.py --sizes 1000 10000 100000 --queries 200 --batch 8
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from doc_index import DocumentIndex, HashingEmbedder  # noqa: E402
+from passage_rank import PASSAGE_WORDS  # noqa: E402
+
+
+def synthetic_documents(count, vocabulary, rng):
+    """One passage-sized document per entry, so ``count`` equals the indexed passages."""
+    return [
+        {"url": f"https://example.com/{i}", "text": " ".join(rng.choices(vocabulary, k=PASSAGE_WORDS - 10))}
+        for i in range(count)
+    ]
+
+
+def recall(index, documents, queries, k, phrase_words, rng):
+    """Fractions of passage-phrase queries found in the top k, and above the threshold too."""
+    found = above = 0
+    for _ in range(queries):
+        document = rng.choice(documents)
+        words = document["text"].split()
+        start = rng.randrange(len(words) - phrase_words)
+        hits = index.search(" ".join(words[start:start + phrase_words]), k=k)
+        scores = [hit["score"] for hit in hits if hit["url"] == document["url"]]
+        found += bool(scores)
+        above += bool(scores) and scores[0] >= index.min_score
+    return found / queries, above / queries
+
+
+def off_topic_rate(index, queries, k, phrase_words, rng):
+    """Fraction of queries sharing no word with the corpus whose best hit still passes the threshold."""
+    passed = 0
+    for _ in range(queries):
+        query = " ".join(f"unrelated{rng.randrange(10000)}" for _ in range(phrase_words))
+        hits = index.search(query, k=k)
+        passed += bool(hits) and hits[0]["score"] >= index.min_score
+    return passed / queries
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def bench_size(size, queries, batch, k, vocabulary, rng, phrase_words=8):
+    with tempfile.TemporaryDirectory() as directory:
+        index = DocumentIndex(directory, embedder=HashingEmbedder())
+
+        started = time.perf_counter()
+        documents = synthetic_documents(size, vocabulary, rng)
+        for start in range(0, size, 1000):
+            index.add_documents(documents[start:start + 1000])
+        add_seconds = time.perf_counter() - started
+
+        latencies = []
+        for _ in range(queries):
+            query = [" ".join(rng.choices(vocabulary, k=6)) for _ in range(batch)]
+            started = time.perf_counter()
+            index.search(query, k=k)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        recall_at_k, recall_above_min_score = recall(index, documents, queries, k, phrase_words, rng)
+        return {
+            "passages": size,
+            "add_passages_per_second": size / add_seconds,
+            "query_batch": batch,
+            "query_ms_p50": statistics.median(latencies),
+            "query_ms_p95": percentile(latencies, 0.95),
+            "recall_at_k": recall_at_k,
+            "recall_above_min_score": recall_above_min_score,
+            "off_topic_above_min_score": off_topic_rate(index, queries, k, phrase_words, rng),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=50, help="Query batches timed, and recall queries, per size")
+    parser.add_argument("--batch", type=int, default=1, help="Queries scored together per search call")
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--output", help="Write the JSON report to this file as well")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocabulary = [f"term{i}" for i in range(20000)]
+    report = {
+        "benchmark": "doc_index",
+        "embedder": HashingEmbedder.name,
+        "min_score": HashingEmbedder.min_score,
+        "results": [bench_size(size, args.queries, args.batch, args.k, vocabulary, rng) for size in args.sizes],
+    }
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# benchmarks/bench_html_parse.py
+
+"""Compares the original BeautifulSoup extraction with the html_extract backends.
+
+Runs every ``.html`` file of a saved corpus (by default the offline
+benchmark corpus, see fixtures.py) through the old path (decode the
+whole body as ``response.text`` did, ``html.parser``, ``get_text`` twice
+per paragraph) and through ``decode_html`` plus ``extract_main_text`` with
+each installed backend, and reports per-page p50/p95 parse time, how often
+each backend's text matches the old path, and how many pages came out
+garbled (mojibake or replacement characters):
+
+    python benchmarks/bench_html_parse.py --save https://example.com/a https://example.com/b
+    python benchmarks/bench_html_parse.py --rounds 5 --output html_parse.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from html_extract import available_backends, decode_html, extract_main_text  # noqa: E402
+from fixtures import DEFAULT_CORPUS, MANIFEST, ensure_corpus, load_manifest  # noqa: E402
+
+# Typical byte sequences of UTF-8 read as windows-1252, and the replacement character
+_GARBLED = ("Ã", "â€", "Â", "\ufffd")
+
+
+def legacy_extract(html, content_type=""):
+    """The extraction web_search used before the pluggable backends."""
+    from bs4 import BeautifulSoup
+    from requests.utils import get_encoding_from_headers
+
+    # response.text: the header charset, ISO-8859-1 for text/* without one
+    encoding = get_encoding_from_headers({"content-type": content_type}) if content_type else None
+    soup = BeautifulSoup(html.decode(encoding or "utf-8", errors="replace"), "html.parser")
+    main_content = soup.find("article") or soup.find("div", class_="content") or soup.body
+    paragraphs = main_content.find_all("p") if main_content else []
+    text = " ".join([p.get_text(strip=True) for p in paragraphs if len(p.get_text(strip=True)) > 30])
+    return text if len(text) > 100 else "No meaningful text found."
+
+
+def save_pages(urls, corpus):
+    """Downloads pages into the corpus directory, named by a hash of their URL."""
+    import requests
+
+    os.makedirs(corpus, exist_ok=True)
+    for url in urls:
+        try:
+            response = requests.get(url, timeout=15, headers={"User-Agent": "Mozilla/5.0"})
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"⚠️ Could not save {url}: {e}", file=sys.stderr)
+            continue
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16] + ".html"
+        with open(os.path.join(corpus, name), "wb") as f:
+            f.write(response.content)
+        print(f"💾 Saved {url} as {name}", file=sys.stderr)
+
+
+def load_corpus(corpus):
+    """Returns (body, content type) per page; the type comes from the manifest, if the page is in one."""
+    if not os.path.isdir(corpus):
+        return []
+    manifest = load_manifest(corpus) if os.path.exists(os.path.join(corpus, MANIFEST)) else {"pages": {}}
+    pages = []
+    for name in sorted(os.listdir(corpus)):
+        if name.endswith(".html"):
+            with open(os.path.join(corpus, name), "rb") as f:
+                pages.append((f.read(), manifest["pages"].get(name, {}).get("contentType", "")))
+    return pages
+
+
+def garbled(text):
+    return any(marker in text for marker in _GARBLED)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def bench(extract, pages, rounds):
+    latencies, texts = [], []
+    for _ in range(rounds):
+        texts = []
+        for html, content_type in pages:
+            started = time.perf_counter()
+            texts.append(extract(html, content_type))
+            latencies.append((time.perf_counter() - started) * 1000)
+    return latencies, texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="Directory of saved .html pages")
+    parser.add_argument("--save", nargs="+", metavar="URL", help="Download these pages into the corpus first")
+    parser.add_argument("--rounds", type=int, default=3, help="Passes over the corpus per parser")
+    parser.add_argument("--output", help="Write the JSON report to this file as well")
+    args = parser.parse_args()
+
+    if args.corpus == DEFAULT_CORPUS:
+        ensure_corpus()
+    if args.save:
+        save_pages(args.save, args.corpus)
+    pages = load_corpus(args.corpus)
+    if not pages:
+        sys.exit(f"No .html files in {args.corpus}; add some with --save URL...")
+
+    legacy_latencies, expected = bench(legacy_extract, pages, args.rounds)
+    results = [{
+        "parser": "legacy-bs4",
+        "page_ms_p50": statistics.median(legacy_latencies),
+        "page_ms_p95": percentile(legacy_latencies, 0.95),
+        "matches_legacy": len(pages),
+        "garbled_pages": sum(map(garbled, expected)),
+    }]
+    for backend in available_backends():
+        latencies, texts = bench(
+            lambda html, content_type: extract_main_text(decode_html(html, content_type), backend=backend),
+            pages, args.rounds,
+        )
+        results.append({
+            "parser": backend,
+            "page_ms_p50": statistics.median(latencies),
+            "page_ms_p95": percentile(latencies, 0.95),
+            "matches_legacy": sum(text == old for text, old in zip(texts, expected)),
+            "garbled_pages": sum(map(garbled, texts)),
+        })
+
+    report = {
+        "benchmark": "html_parse",
+        "pages": len(pages),
+        "corpus_bytes": sum(len(html) for html, _ in pages),
+        "rounds": args.rounds,
+        "results": results,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_import_time.py
+
+"""Measures the import cost of Uriel modules with ``python -X importtime``.
+
+Exits with status 1 when the median cumulative import time of a module is
+above its threshold, so it can guard against startup regressions:
+
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --module app --max-ms 4000 --runs 3
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Default budget per module, in milliseconds of cumulative import time
+DEFAULT_THRESHOLDS_MS = {
+    "web_search": 1500,
+    "app": 5000,
+}
+
+
+def import_times(module):
+    """Imports a module in a fresh interpreter and returns {package: cumulative_us}."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{completed.stderr[-2000:]}")
+
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, package = line[len("import time:"):].split("|")
+        times[package.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", action="append", help="Module to measure (repeatable)")
+    parser.add_argument("--max-ms", type=float, help="Threshold applied to every measured module")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    modules = args.module or list(DEFAULT_THRESHOLDS_MS)
+    failed = False
+
+    for module in modules:
+        runs = [import_times(module) for _ in range(args.runs)]
+        median_ms = statistics.median(run[module] for run in runs) / 1000
+        threshold = args.max_ms or DEFAULT_THRESHOLDS_MS.get(module)
+
+        status = "ok"
+        if threshold is not None and median_ms > threshold:
+            status = f"REGRESSION (limit {threshold:.0f} ms)"
+            failed = True
+        print(f"{module}: {median_ms:.1f} ms median over {args.runs} runs - {status}")
+
+        slowest = sorted(runs[-1].items(), key=lambda item: item[1], reverse=True)
+        for package, cumulative in slowest[1:args.top + 1]:
+            print(f"    {cumulative / 1000:8.1f} ms  {package}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
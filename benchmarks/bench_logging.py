@@ -0,0 +1,122 @@
+# benchmarks/bench_logging.py
+
+"""Measures how long a log call blocks the calling thread.
+
+Compares the old synchronous setup (FileHandler plus StreamHandler on the
+root logger) with logger_config's queued setup in text and JSON format. The
+console is stood in for by a file, so it measures the handlers, not the
+terminal. Reports per-call p50/p99 and mean in microseconds, and how long
+the queued setups take to drain to disk:
+
+    python benchmarks/bench_logging.py
+    python benchmarks/bench_logging.py --calls 50000 --threads 4 --output logging.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logger_config  # noqa: E402
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def synchronous_setup(directory, console):
+    """The configuration logger_config used before logging went through a queue."""
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    logging.basicConfig(
+        level=logging.INFO,
+        format=logger_config.TEXT_FORMAT,
+        handlers=[
+            logging.FileHandler(os.path.join(directory, 'sync.log'), mode='a'),
+            logging.StreamHandler(console),
+        ],
+        force=True,
+    )
+
+
+def log_calls(calls, threads):
+    """Logs ``calls`` messages per thread and returns the per-call latencies in microseconds."""
+    logger = logging.getLogger("bench")
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        own = []
+        for i in range(calls):
+            started = time.perf_counter_ns()
+            logger.info(f"🌍 Scraping URL: https://example.com/article/{i}")
+            own.append((time.perf_counter_ns() - started) / 1000)
+        with lock:
+            latencies.extend(own)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return latencies
+
+
+def bench(name, calls, threads):
+    started = time.perf_counter()
+    latencies = log_calls(calls, threads)
+    logged = time.perf_counter() - started
+    logger_config.stop_logging()  # Waits until every queued record is written
+    drained = time.perf_counter() - started
+    return {
+        "setup": name,
+        "calls": calls * threads,
+        "threads": threads,
+        "call_us_p50": statistics.median(latencies),
+        "call_us_p99": percentile(latencies, 0.99),
+        "call_us_mean": statistics.fmean(latencies),
+        "logging_seconds": logged,
+        "written_seconds": drained,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20000, help="Log calls per thread")
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--output", help="Write the JSON report to this file as well")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory, open(os.path.join(directory, "console.log"), "w") as console:
+        logger_config.stop_logging()
+        synchronous_setup(directory, console)
+        results.append(bench("sync", args.calls, args.threads))
+
+        for log_format in ("text", "json"):
+            log_file = os.path.join(directory, f"queued-{log_format}.log")
+            listener = logger_config.setup_logging(log_format=log_format, log_file=log_file, console=False)
+            # The queued console handler writes to the stand-in file like the synchronous one
+            console_handler = logging.StreamHandler(console)
+            console_handler.setFormatter(listener.handlers[0].formatter)
+            listener.handlers = listener.handlers + (console_handler,)
+            results.append(bench(f"queued-{log_format}", args.calls, args.threads))
+
+    report = {"benchmark": "logging", "results": results}
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
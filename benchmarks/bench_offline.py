@@ -0,0 +1,218 @@
+# benchmarks/bench_offline.py
+
+"""End-to-end benchmark that needs no network, DuckDuckGo or Ollama.
+
+Serves the fixture corpus from local stub hosts and a stub search backend,
+answers LLM calls from a stub OpenAI-compatible server, and measures
+throughput and p50/p95 latency of ``search_and_extract``,
+``WebSearchTool._run``, ``run_research`` and the ``/run_research`` endpoint
+under concurrent load. Every scenario runs in a fresh process with empty
+caches in a temporary directory, so results are comparable across commits:
+
+    python benchmarks/bench_offline.py --output bench.json
+    python benchmarks/bench_offline.py --scenarios search_and_extract tool --requests 40 --concurrency 8
+
+``run_research`` and ``http`` need the full requirements (crewai, Flask) and
+a config.py, as the app does.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+SCENARIOS = ("search_and_extract", "tool", "run_research", "http")
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def measure(call, topics, concurrency):
+    """Runs ``call(topic)`` for every topic on ``concurrency`` threads and summarizes the latencies."""
+    def timed(topic):
+        started = time.perf_counter()
+        try:
+            ok = call(topic)
+        except Exception:
+            traceback.print_exc()
+            ok = False
+        return (time.perf_counter() - started) * 1000, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(timed, topics))
+    wall = time.perf_counter() - started
+
+    latencies = [ms for ms, _ in outcomes]
+    return {
+        "requests": len(topics),
+        "concurrency": concurrency,
+        "errors": sum(1 for _, ok in outcomes if not ok),
+        "wall_seconds": wall,
+        "throughput_per_second": len(topics) / wall,
+        "latency_ms_p50": statistics.median(latencies),
+        "latency_ms_p95": percentile(latencies, 0.95),
+        "latency_ms_mean": statistics.fmean(latencies),
+    }
+
+
+def _scenario_call(name, llm_url):
+    """Imports what a scenario needs and returns its ``call(topic) -> succeeded``."""
+    import web_search
+
+    if name == "search_and_extract":
+        return lambda topic: bool(web_search.search_and_extract(topic, num_results=5))
+    if name == "tool":
+        tool = web_search.WebSearchTool()
+        return lambda topic: "Source:" in tool._run(topic)
+
+    import agents
+    import model_routing
+    agents.OLLAMA_BASE_URL = llm_url
+    model_routing.prepare_models(base_url=llm_url)
+
+    if name == "run_research":
+        import research_runner
+        return lambda topic: research_runner.run_research(topic).get("status") == "success"
+
+    import app
+    import requests
+    from werkzeug.serving import make_server
+
+    server = make_server("127.0.0.1", 0, app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/run_research"
+    session = requests.Session()
+    return lambda topic: session.post(url, json={"topic": topic}, timeout=600).json().get("status") == "success"
+
+
+def run_scenario(args):
+    """Child-process entry point: one scenario against fresh stubs and empty caches."""
+    sys.path[:0] = [REPO_ROOT, BENCH_DIR]
+    corpus = os.path.abspath(args.corpus)
+    os.chdir(tempfile.mkdtemp(prefix=f"uriel-bench-{args.scenario}-"))
+    os.environ["URIEL_WARM_MODELS"] = "0"  # The scenario warms the stub LLM itself
+
+    import stub_ollama
+    import stub_web
+
+    _, web, search_url = stub_web.serve(args.hosts, corpus=corpus, latency=args.page_latency,
+                                        bytes_per_second=args.bytes_per_second)
+    _, _, llm_url = stub_ollama.serve(load_seconds=args.llm_load_seconds,
+                                      first_token_seconds=args.llm_first_token_seconds,
+                                      tokens_per_second=args.llm_tokens_per_second)
+
+    import web_search
+    web_search.SEARCH_BACKEND_URL = search_url
+
+    call = _scenario_call(args.scenario, llm_url)
+    topics = list(web.manifest["topics"])
+    # A distinct query per request, so the search and run caches start cold
+    requests = [f"{topics[i % len(topics)]} {i // len(topics)}" for i in range(args.requests)]
+    result = measure(call, requests, args.concurrency)
+    result["stub_requests_served"] = web.hits
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=24, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--corpus", default=os.path.join(BENCH_DIR, "fixtures", "corpus"))
+    parser.add_argument("--hosts", type=int, default=4, help="Stub web hosts the pages are spread over")
+    parser.add_argument("--page-latency", type=float, default=0.05, help="Seconds before each stub web response")
+    parser.add_argument("--bytes-per-second", type=int, default=0, help="Stub web bandwidth per response")
+    parser.add_argument("--llm-load-seconds", type=float, default=2.0)
+    parser.add_argument("--llm-first-token-seconds", type=float, default=0.2)
+    parser.add_argument("--llm-tokens-per-second", type=float, default=100.0)
+    parser.add_argument("--verbose", action="store_true", help="Show the output of the scenario processes")
+    parser.add_argument("--output", help="Write the JSON report to this file as well")
+    parser.add_argument("--scenario", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        try:
+            result = run_scenario(args)
+        except Exception as e:
+            traceback.print_exc()
+            result = {"error": f"{type(e).__name__}: {e}"}
+        with open(args.result_file, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        return
+
+    sys.path.insert(0, BENCH_DIR)
+    from fixtures import ensure_corpus
+    ensure_corpus(args.corpus)
+
+    forwarded = _without_option(_without_option(sys.argv[1:], "--scenarios"), "--output")
+    results = {}
+    for scenario in args.scenarios:
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+            result_file = f.name
+        output = None if args.verbose else subprocess.DEVNULL
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), *forwarded, "--scenario", scenario, "--result-file", result_file],
+            stdout=output, stderr=output,
+        )
+        try:
+            with open(result_file, encoding="utf-8") as f:
+                results[scenario] = json.load(f)
+        except (OSError, ValueError):
+            results[scenario] = {"error": "scenario process exited without a result"}
+        finally:
+            if os.path.exists(result_file):
+                os.remove(result_file)
+        print(f"⏱️ {scenario}: {results[scenario]}", file=sys.stderr)
+
+    report = {
+        "benchmark": "offline",
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "settings": {key: value for key, value in vars(args).items()
+                     if key not in ("scenarios", "output", "verbose", "scenario", "result_file")},
+        "results": results,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+def _without_option(argv, option):
+    """Drops an option and its values from an argument list."""
+    kept, skipping = [], False
+    for arg in argv:
+        if arg == option or arg.startswith(option + "="):
+            skipping = arg == option
+            continue
+        if skipping and not arg.startswith("--"):
+            continue
+        skipping = False
+        kept.append(arg)
+    return kept
+
+
+def _git(*command):
+    try:
+        return subprocess.run(["git", *command], cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# benchmarks/fixtures.py
+
+"""The offline benchmark corpus: HTML and PDF pages grouped by search topic.
+
+A corpus directory holds the page files and a ``manifest.json``:
+
+    {"topics": {"<topic>": ["<page>", ...]},
+     "pages": {"<page>": {"file": "...", "contentType": "...", "source": "<url or null>"}}}
+
+``generate`` writes a deterministic synthetic corpus, so runs on different
+commits see identical input; it includes syndicated near-copies, PDFs, and
+non-ASCII pages in UTF-8 and windows-1252 whose charset is only given in the
+Content-Type header, so deduplication, PDF extraction and decoding are
+exercised. ``record`` adds real pages fetched from the web under a topic:
+
+    python benchmarks/fixtures.py generate
+    python benchmarks/fixtures.py record "solid state batteries" https://example.com/a https://example.com/b.pdf
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "corpus")
+MANIFEST = "manifest.json"
+CORPUS_VERSION = 2   # Bumped whenever generate() changes, so stale generated corpora are rebuilt
+
+DEFAULT_TOPICS = [
+    "Latest developments in quantum computing and its practical applications",
+    "Solid state batteries for electric vehicles",
+    "Large language model inference on consumer hardware",
+    "CRISPR gene editing clinical trials",
+    "Carbon capture and storage at industrial scale",
+    "Edge computing for autonomous vehicles",
+    "Microplastics in drinking water",
+    "Post-quantum cryptography standards",
+]
+
+_FILLER = (
+    "research results study analysis data system method performance model approach evidence report "
+    "industry market cost energy efficiency deployment scale hardware software network security policy "
+    "experiment measurement benchmark latency throughput accuracy quality risk benefit trend adoption"
+).split()
+
+
+def load_manifest(corpus=DEFAULT_CORPUS):
+    with open(os.path.join(corpus, MANIFEST), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(corpus, manifest):
+    with open(os.path.join(corpus, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def _paragraphs(topic, rng, count):
+    words = topic.lower().split() + _FILLER
+    paragraphs = []
+    for _ in range(count):
+        sentences = []
+        for _ in range(rng.randint(3, 6)):
+            sentence = " ".join(rng.choices(words, k=rng.randint(10, 22)))
+            sentences.append(sentence[0].upper() + sentence[1:] + ".")
+        paragraphs.append(" ".join(sentences))
+    return paragraphs
+
+
+# Words mixed into some pages so charset handling is exercised
+_ACCENTED = ["Zürich", "café", "naïve", "résumé", "façade", "Ærøskøbing", "São Paulo", "€120", "“quoted”", "—"]
+
+
+def _accented(paragraphs, rng):
+    return [" ".join(word if rng.random() > 0.15 else rng.choice(_ACCENTED) for word in paragraph.split(" "))
+            for paragraph in paragraphs]
+
+
+def _html_page(title, paragraphs, rng, encoding="utf-8"):
+    nav = "".join(f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(rng.randint(20, 60)))
+    script = "var analytics = {" + ",".join(f'"k{i}": {i}' for i in range(rng.randint(200, 800))) + "};"
+    body = "".join(f"<p>{paragraph}</p>" for paragraph in paragraphs)
+    return (
+        f"<!DOCTYPE html><html><head><title>{title}</title><script>{script}</script>"
+        f"<style>body {{ font-family: sans-serif; }}</style></head><body>"
+        f"<header><nav><ul>{nav}</ul></nav></header>"
+        f"<article><h1>{title}</h1>{body}</article>"
+        f"<footer><p>Copyright</p><p>Subscribe to our newsletter for more stories like this one.</p></footer>"
+        f"</body></html>"
+    ).encode(encoding)
+
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _pdf_document(paragraphs, lines_per_page=45, width=95):
+    """A minimal multi-page PDF with Helvetica text, readable by pdfplumber."""
+    lines = []
+    for paragraph in paragraphs:
+        words, line = paragraph.split(), ""
+        for word in words:
+            if len(line) + len(word) + 1 > width:
+                lines.append(line)
+                line = word
+            else:
+                line = f"{line} {word}".strip()
+        lines += [line, ""]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page_lines in pages:
+        stream = "BT /F1 10 Tf 50 760 Td 14 TL " + " ".join(f"({_pdf_escape(line)}) '" for line in page_lines) + " ET"
+        objects.append(f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream")
+        content_ref = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_ref} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return bytes(out)
+
+
+def generate(corpus=DEFAULT_CORPUS, topics=DEFAULT_TOPICS, pages_per_topic=8, seed=7):
+    """Writes the synthetic corpus; per topic, one page is a near-copy and one a PDF."""
+    rng = random.Random(seed)
+    os.makedirs(corpus, exist_ok=True)
+    manifest = {"version": CORPUS_VERSION, "topics": {}, "pages": {}}
+
+    for t, topic in enumerate(topics):
+        names, first_paragraphs = [], []
+        for i in range(pages_per_topic):
+            name = f"t{t:02d}-p{i:02d}"
+            if i == pages_per_topic - 1:
+                paragraphs = _paragraphs(topic, rng, rng.randint(30, 60))
+                data, content_type, name = _pdf_document(paragraphs), "application/pdf", name + ".pdf"
+            else:
+                if i == 1:
+                    # Syndicated copy of the first page with a different headline and a credit line
+                    paragraphs = first_paragraphs + ["This story was originally published by one of our partner sites."]
+                else:
+                    paragraphs = _paragraphs(topic, rng, rng.randint(8, 40))
+                if i == 0:
+                    first_paragraphs = paragraphs
+                # Pages 2 and 3 have non-ASCII text whose charset is only given in the header
+                encoding = "windows-1252" if i == 3 else "utf-8"
+                if i in (2, 3):
+                    paragraphs = _accented(paragraphs, rng)
+                data = _html_page(f"{topic} ({i})", paragraphs, rng, encoding)
+                content_type, name = f"text/html; charset={encoding}", name + ".html"
+            with open(os.path.join(corpus, name), "wb") as f:
+                f.write(data)
+            manifest["pages"][name] = {"file": name, "contentType": content_type, "source": None}
+            names.append(name)
+        manifest["topics"][topic] = names
+
+    _save_manifest(corpus, manifest)
+    return manifest
+
+
+def ensure_corpus(corpus=DEFAULT_CORPUS):
+    """Returns the corpus manifest, generating the synthetic corpus if there is none.
+
+    A corpus made by an older generate() is regenerated, keeping its recorded pages.
+    """
+    if not os.path.exists(os.path.join(corpus, MANIFEST)):
+        print(f"🧪 Generating benchmark corpus in {corpus}", file=sys.stderr)
+        return generate(corpus)
+    manifest = load_manifest(corpus)
+    if manifest.get("version") == CORPUS_VERSION:
+        return manifest
+
+    print(f"🧪 Regenerating outdated benchmark corpus in {corpus}", file=sys.stderr)
+    fresh = generate(corpus)
+    recorded = {name: page for name, page in manifest["pages"].items() if page.get("source")}
+    fresh["pages"].update(recorded)
+    for topic, names in manifest["topics"].items():
+        if names and all(name in recorded for name in names):
+            fresh["topics"][topic] = names
+    _save_manifest(corpus, fresh)
+    return fresh
+
+
+def record(topic, urls, corpus=DEFAULT_CORPUS):
+    """Downloads pages into the corpus and lists them under ``topic``, replacing earlier recordings."""
+    import requests
+
+    manifest = ensure_corpus(corpus)
+    names = []
+    for url in urls:
+        try:
+            response = requests.get(url, timeout=20, headers={"User-Agent": "Mozilla/5.0"})
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"⚠️ Could not record {url}: {e}", file=sys.stderr)
+            continue
+        content_type = response.headers.get("Content-Type", "text/html")
+        extension = ".pdf" if "pdf" in content_type.lower() else ".html"
+        name = "rec-" + hashlib.sha1(url.encode("utf-8")).hexdigest()[:16] + extension
+        with open(os.path.join(corpus, name), "wb") as f:
+            f.write(response.content)
+        manifest["pages"][name] = {"file": name, "contentType": content_type, "source": url}
+        names.append(name)
+        print(f"💾 Recorded {url} as {name}", file=sys.stderr)
+
+    manifest["topics"][topic] = names
+    _save_manifest(corpus, manifest)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    commands = parser.add_subparsers(dest="command", required=True)
+    generate_parser = commands.add_parser("generate", help="Write the synthetic corpus")
+    generate_parser.add_argument("--pages-per-topic", type=int, default=8)
+    record_parser = commands.add_parser("record", help="Record live pages under a topic")
+    record_parser.add_argument("topic")
+    record_parser.add_argument("urls", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        manifest = generate(args.corpus, pages_per_topic=args.pages_per_topic)
+    else:
+        manifest = record(args.topic, args.urls, args.corpus)
+    print(json.dumps({"topics": len(manifest["topics"]), "pages": len(manifest["pages"])}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# benchmarks/stub_ollama.py
+
+"""A local stand-in for Ollama that needs no models or GPU.
+
+Serves the native endpoints used by model_routing (``/api/show``,
+``/api/create``, ``/api/generate``) and the OpenAI-compatible
+``/v1/chat/completions`` endpoint the agents call, streaming or not. The
+first request for a model pays a simulated load delay unless that model was
+preloaded, which makes the effect of warm-up measurable. Time to first token
+and the token rate are configurable too:
+
+    python benchmarks/stub_ollama.py --port 11435 --load-seconds 3
+    python model_routing.py --base-url http://127.0.0.1:11435/v1
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = (
+    "Thought: I now know the final answer\n"
+    "Final Answer: The stub model summarizes the provided context in a few neutral sentences."
+)
+
+
+class StubOllama:
+    """Model state shared by the request handlers of one stub server."""
+
+    def __init__(self, load_seconds=2.0, first_token_seconds=0.1, tokens_per_second=200.0, reply=DEFAULT_REPLY):
+        self.load_seconds = load_seconds
+        self.first_token_seconds = first_token_seconds
+        self.tokens_per_second = tokens_per_second
+        self.reply = reply
+        self.models = {}        # Derived models: name -> {"from", "parameters"}
+        self.loaded = {}        # Loaded model -> keep_alive it was given
+        self.requests = []      # (path, model) of every request, for inspection
+        self._lock = threading.Lock()
+
+    def load(self, model, keep_alive=None):
+        """Simulates loading a model; returns the load time in seconds."""
+        with self._lock:
+            already = model in self.loaded
+            self.loaded[model] = keep_alive if keep_alive is not None else self.loaded.get(model, "5m")
+        if already:
+            return 0.0
+        time.sleep(self.load_seconds)
+        return self.load_seconds
+
+    def record(self, path, model):
+        with self._lock:
+            self.requests.append((path, model))
+
+
+def make_handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _json(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def do_GET(self):
+            if self.path.rstrip("/") in ("/v1/models", "/api/tags"):
+                names = sorted(set(stub.models) | set(stub.loaded))
+                return self._json(200, {"object": "list", "data": [{"id": name, "object": "model"} for name in names]})
+            self._json(404, {"error": "not found"})
+
+        def do_POST(self):
+            payload = self._body()
+            model = payload.get("model", "")
+            stub.record(self.path, model)
+
+            if self.path == "/api/show":
+                if model in stub.models:
+                    return self._json(200, {"parameters": stub.models[model]["parameters"]})
+                return self._json(404, {"error": f"model '{model}' not found"})
+            if self.path == "/api/create":
+                stub.models[model] = {"from": payload.get("from"), "parameters": payload.get("parameters", {})}
+                return self._json(200, {"status": "success"})
+            if self.path == "/api/generate":
+                seconds = stub.load(model, payload.get("keep_alive"))
+                return self._json(200, {"model": model, "response": "", "done": True,
+                                        "load_duration": int(seconds * 1e9)})
+            if self.path == "/v1/chat/completions":
+                return self._chat(payload, model)
+            self._json(404, {"error": "not found"})
+
+        def _chat(self, payload, model):
+            stub.load(model)
+            time.sleep(stub.first_token_seconds)  # Prompt processing before the first token
+            words = stub.reply.split(" ")
+            delay = 1.0 / stub.tokens_per_second if stub.tokens_per_second else 0.0
+            completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+            usage = {"prompt_tokens": sum(len(str(m.get("content", ""))) // 4 for m in payload.get("messages", [])),
+                     "completion_tokens": len(words)}
+            usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+            if not payload.get("stream"):
+                time.sleep(delay * len(words))
+                return self._json(200, {
+                    "id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": stub.reply},
+                                 "finish_reason": "stop"}],
+                    "usage": usage,
+                })
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for i, word in enumerate(words):
+                time.sleep(delay)
+                chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                         "model": model, "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word},
+                                                      "finish_reason": None}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            final = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+            self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+            self.close_connection = True
+
+    return Handler
+
+
+def serve(host="127.0.0.1", port=0, **options):
+    """Starts a stub server on a daemon thread; returns (server, stub, base_url ending in /v1)."""
+    stub = StubOllama(**options)
+    server = ThreadingHTTPServer((host, port), make_handler(stub))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stub, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--load-seconds", type=float, default=2.0, help="Simulated cold-load time per model")
+    parser.add_argument("--first-token-seconds", type=float, default=0.1, help="Latency before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    args = parser.parse_args()
+
+    server, _, base_url = serve(args.host, args.port, load_seconds=args.load_seconds,
+                                first_token_seconds=args.first_token_seconds,
+                                tokens_per_second=args.tokens_per_second)
+    print(f"🧪 Stub Ollama listening on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# benchmarks/stub_web.py
+
+"""Local search backend and web hosts serving the benchmark corpus.
+
+``/search?q=...&max_results=N`` answers like DuckDuckGo text search with the
+pages of the corpus topic that best matches the query, so web_search can use
+it through ``SEARCH_BACKEND_URL``. Pages are spread over several ports, which
+web_search treats as separate hosts for its per-host fetch limit, and each
+response can be delayed and throttled to imitate real sites:
+
+    python benchmarks/stub_web.py --hosts 4 --latency 0.05
+    URIEL_SEARCH_BACKEND_URL=http://127.0.0.1:8701/search python app.py
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixtures import DEFAULT_CORPUS, ensure_corpus  # noqa: E402
+
+_WORD = re.compile(r"\w+")
+
+
+class StubWeb:
+    """The corpus and the addresses of the hosts serving it."""
+
+    def __init__(self, corpus=DEFAULT_CORPUS, latency=0.02, bytes_per_second=0):
+        self.corpus = corpus
+        self.manifest = ensure_corpus(corpus)
+        self.latency = latency
+        self.bytes_per_second = bytes_per_second
+        self.host_urls = []
+        self.hits = 0
+        self._lock = threading.Lock()
+
+    def page_url(self, name):
+        index = sorted(self.manifest["pages"]).index(name)
+        return f"{self.host_urls[index % len(self.host_urls)]}/pages/{name}"
+
+    def search(self, query, max_results):
+        """Pages of the topic sharing the most words with the query."""
+        words = set(_WORD.findall(query.lower()))
+        topic = max(self.manifest["topics"], key=lambda t: len(words & set(_WORD.findall(t.lower()))))
+        return [
+            {"title": name, "href": self.page_url(name), "body": ""}
+            for name in self.manifest["topics"][topic][:max_results]
+        ]
+
+
+def make_handler(web):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body, content_type):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if self.command == "HEAD":
+                return
+            if not web.bytes_per_second:
+                self.wfile.write(body)
+                return
+            step = max(1, web.bytes_per_second // 20)
+            for start in range(0, len(body), step):
+                self.wfile.write(body[start:start + step])
+                time.sleep(len(body[start:start + step]) / web.bytes_per_second)
+
+        def do_GET(self):
+            time.sleep(web.latency)
+            with web._lock:
+                web.hits += 1
+            url = urlparse(self.path)
+            if url.path == "/search":
+                params = parse_qs(url.query)
+                results = web.search(params.get("q", [""])[0], int(params.get("max_results", ["10"])[0]))
+                return self._send(200, json.dumps(results).encode("utf-8"), "application/json")
+
+            name = url.path.rsplit("/", 1)[-1]
+            page = web.manifest["pages"].get(name) if url.path.startswith("/pages/") else None
+            if page is None:
+                return self._send(404, b"not found", "text/plain")
+            with open(os.path.join(web.corpus, page["file"]), "rb") as f:
+                self._send(200, f.read(), page["contentType"])
+
+        do_HEAD = do_GET
+
+    return Handler
+
+
+def serve(hosts=4, host="127.0.0.1", port=0, **options):
+    """Starts the stub hosts on daemon threads; returns (servers, web, search_url).
+
+    The first host also answers searches. With ``port`` set, hosts use
+    consecutive ports from it.
+    """
+    web = StubWeb(**options)
+    servers = []
+    for i in range(hosts):
+        server = ThreadingHTTPServer((host, port + i if port else 0), make_handler(web))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        web.host_urls.append(f"http://{host}:{server.server_address[1]}")
+    return servers, web, f"{web.host_urls[0]}/search"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--hosts", type=int, default=4, help="Ports the pages are spread over")
+    parser.add_argument("--port", type=int, default=8701, help="Port of the first host")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds before each response")
+    parser.add_argument("--bytes-per-second", type=int, default=0, help="Bandwidth per response; 0 is unlimited")
+    args = parser.parse_args()
+
+    servers, _, search_url = serve(args.hosts, port=args.port, corpus=args.corpus, latency=args.latency,
+                                   bytes_per_second=args.bytes_per_second)
+    print(f"🧪 Stub search backend at {search_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        for server in servers:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
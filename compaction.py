@@ -0,0 +1,135 @@
+# compaction.py
+
+import os
+import re
+
+from logger_config import logger
+from metrics import context_tokens, span
+
+# Compaction settings
+COMPACTION_ENABLED = os.environ.get("URIEL_COMPACTION", "1") != "0"  # Set URIEL_COMPACTION=0 to pass context through
+CONTEXT_TOKEN_BUDGET = 3000   # Approximate tokens of earlier task output a task receives
+MIN_DEDUPE_CHARS = 30         # Shorter lines (headings, separators) may repeat
+
+_THINK_BLOCK = re.compile(r"<think>.*?</think>", re.DOTALL)
+_OPEN_THINK = re.compile(r"<think>.*?(\n\s*\n|$)", re.DOTALL)  # Unterminated: up to the next paragraph only
+_URL = re.compile(r"https?://[^\s<>\"')\]]+")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def strip_reasoning(text):
+    """Removes the <think> blocks a reasoning model put before its answer.
+
+    Some chat templates drop the opening tag, so a lone ``</think>`` ends the reasoning too.
+    A block that was never closed (a truncated answer) is stripped up to the next
+    paragraph; without one only the tag goes, as its end cannot be told apart from the answer.
+    """
+    text = _THINK_BLOCK.sub("", text).rsplit("</think>", 1)[-1]
+    return _OPEN_THINK.sub(lambda m: "" if m.group(1) else m.group(0)[len("<think>"):], text).strip()
+
+
+def _urls(text):
+    return [url.rstrip(".,;:") for url in _URL.findall(text)]
+
+
+def _normalize(line):
+    return " ".join(line.lower().split())
+
+
+def dedupe_paragraphs(text):
+    """Drops repeated paragraphs, and lines already seen earlier in the text."""
+    seen_paragraphs, seen_lines, kept = set(), set(), []
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        key = _normalize(paragraph)
+        if not key or key in seen_paragraphs:
+            continue
+        seen_paragraphs.add(key)
+
+        lines = []
+        for line in paragraph.splitlines():
+            line_key = _normalize(line)
+            if len(line_key) >= MIN_DEDUPE_CHARS:
+                if line_key in seen_lines:
+                    continue
+                seen_lines.add(line_key)
+            lines.append(line)
+        if any(line.strip() for line in lines):
+            kept.append("\n".join(lines).strip())
+    return kept
+
+
+def _truncate(paragraph, token_budget):
+    from passage_rank import CHARS_PER_TOKEN
+
+    cut = paragraph[:max(0, token_budget - 1) * CHARS_PER_TOKEN]
+    return cut.rsplit(" ", 1)[0] + " …" if len(cut) < len(paragraph) else paragraph
+
+
+def fit_to_budget(paragraphs, query, token_budget):
+    """Keeps the paragraphs most relevant to ``query`` that fit the budget, in their original order.
+
+    URLs cited only in dropped paragraphs are listed at the end, so the next
+    agent can still cite those sources; up to half the budget is set aside
+    for that list.
+    """
+    from passage_rank import bm25_scores, estimate_tokens  # Loads NumPy
+
+    if sum(estimate_tokens(paragraph) for paragraph in paragraphs) <= token_budget:
+        return "\n\n".join(paragraphs)
+
+    all_urls = list(dict.fromkeys(url for paragraph in paragraphs for url in _urls(paragraph)))
+    reserve = min(token_budget // 2, estimate_tokens(", ".join(all_urls)))
+    scores = bm25_scores(query, paragraphs) if query else [0.0] * len(paragraphs)
+    # Paragraphs naming a source go first so citations travel with their claims
+    order = sorted(range(len(paragraphs)), key=lambda i: (not _URL.search(paragraphs[i]), -scores[i], i))
+    kept, used = {}, 0
+    for i in order:
+        cost = estimate_tokens(paragraphs[i])
+        if used + cost <= token_budget - reserve:
+            kept[i] = paragraphs[i]
+            used += cost
+        elif not kept:
+            kept[i] = _truncate(paragraphs[i], token_budget - reserve)
+            used = token_budget - reserve
+
+    compacted = "\n\n".join(kept[i] for i in sorted(kept))
+    cited = {url for i in kept for url in _urls(kept[i])}
+    dropped_sources = [url for url in all_urls if url not in cited]
+    if dropped_sources:
+        listed = []
+        for url in dropped_sources:
+            if estimate_tokens(", ".join(listed + [url])) > reserve:
+                break
+            listed.append(url)
+        more = len(dropped_sources) - len(listed)
+        compacted += "\n\nFurther sources: " + ", ".join(listed) + (f" and {more} more" if more else "")
+    return compacted
+
+
+def compact_context(text, token_budget=CONTEXT_TOKEN_BUDGET, query=""):
+    """Strips reasoning traces, drops repeated content and fits the text into ``token_budget``.
+
+    ``text`` may be a list of task outputs; reasoning is then stripped from
+    each output on its own, so one unclosed tag cannot reach into the next.
+    """
+    if not text:
+        return text
+    outputs = [text] if isinstance(text, str) else text
+    stripped = "\n\n".join(strip_reasoning(output) for output in outputs)
+    return fit_to_budget(dedupe_paragraphs(stripped), query, token_budget)
+
+
+def compact_for_task(name, context, token_budget=CONTEXT_TOKEN_BUDGET, query=""):
+    """Compacts a task's context, counting its tokens before and after per task."""
+    from passage_rank import estimate_tokens
+
+    if not context:
+        return context
+    with span("compact", name) as attrs:
+        compacted = compact_context(context, token_budget, query)
+        raw = context if isinstance(context, str) else "\n".join(context)
+        attrs["tokensBefore"], attrs["tokensAfter"] = estimate_tokens(raw), estimate_tokens(compacted)
+    context_tokens.inc(attrs["tokensBefore"], task=name, stage="raw")
+    context_tokens.inc(attrs["tokensAfter"], task=name, stage="compacted")
+    logger.info(f"🗜️ Compacted context for {name}: ~{attrs['tokensBefore']} -> ~{attrs['tokensAfter']} tokens")
+    return compacted
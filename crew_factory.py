@@ -0,0 +1,199 @@
+# crew_factory.py
+
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from functools import partial
+
+from crewai import Crew
+from agents import build_agents
+from jobs import JOB_WORKERS
+from logger_config import logger, setup_worker_logging, worker_log_queue
+from metrics import collect_trace, replay_spans
+from tasks import build_tasks
+
+# Worker processes that each hold a ready crew; 0 runs crews on the caller's thread
+CREW_POOL_PROCESSES = int(os.environ.get("URIEL_CREW_PROCESSES", "0"))
+CREW_SLOTS = CREW_POOL_PROCESSES or JOB_WORKERS  # Crews running at once in this process, jobs and batches together
+
+TASK_NAMES = ("research", "analyze", "summarize")
+
+
+def build_crew(on_task_done=None, llm=None, http_client=None):
+    """Builds an isolated crew with its own LLM clients, agents and tasks.
+
+    Nothing but ``http_client``, if given, is shared with other crews, so
+    separate runs can execute on separate threads. ``on_task_done(task_name,
+    output)`` is called as each task finishes. Agents use their routed models
+    unless ``llm`` is given.
+    """
+    tasks = build_tasks(*build_agents(llm, http_client=http_client))
+    if on_task_done is not None:
+        set_task_callbacks(tasks, on_task_done)
+
+    return Crew(
+        agents=[task.agent for task in tasks],
+        tasks=list(tasks),
+        verbose=2
+    )
+
+
+_crew_slots = threading.BoundedSemaphore(CREW_SLOTS)
+
+
+@contextmanager
+def crew_slot():
+    """Holds one of the process-wide crew slots while a crew runs, waiting for a free one.
+
+    Queued jobs and batch topics take slots from the same pool, so together
+    they never run more than CREW_SLOTS crews against Ollama.
+    """
+    _crew_slots.acquire()
+    try:
+        yield
+    finally:
+        _crew_slots.release()
+
+
+def set_task_callbacks(tasks, on_task_done):
+    """Has every task call ``on_task_done(task_name, output)`` when it finishes."""
+    for name, task in zip(TASK_NAMES, tasks):
+        task.set_done_callback(partial(on_task_done, name))
+
+
+# State of a pool worker process
+_worker_crew_builder = None
+
+
+def _init_worker(crew_builder, log_queue):
+    setup_worker_logging(log_queue)  # The parent alone writes the log file
+    # A crew is not reusable: every kickoff appends delegation tools to its
+    # tasks. Each run gets a fresh one; only the connections to Ollama stay open.
+    global _worker_crew_builder
+    import httpx
+
+    _worker_crew_builder = partial(crew_builder, http_client=httpx.Client(timeout=None))
+    _worker_crew_builder()  # Loads crewai, LangChain and the agents' modules before the first run
+
+
+def _warm_worker(barrier):
+    # Holding every worker at the barrier forces the pool to start all of them
+    barrier.wait()
+    return os.getpid()
+
+
+def _run_in_worker(runner, topic, events, options):
+    def progress(event, **data):
+        events.put((event, data))
+
+    try:
+        # The spans travel back with the result so the parent's /metrics includes them
+        with collect_trace() as trace:
+            result = runner(topic, progress, crew=_worker_crew_builder(), **options)
+        return result, trace.spans
+    finally:
+        events.put(None)
+
+
+class CrewWorkerPool:
+    """A pool of worker processes that have the crew's libraries loaded and their connections to Ollama open.
+
+    ``crew_builder`` and ``runner`` must be importable top-level functions;
+    ``crew_builder(http_client=...)`` is called in a worker for every run.
+    ``runner(topic, progress, crew=..., **options)`` runs in a worker against
+    that fresh crew; its progress events are forwarded to the caller, and its
+    timing spans are added to the caller's metrics.
+    """
+
+    def __init__(self, crew_builder, runner, processes=CREW_POOL_PROCESSES):
+        self._context = multiprocessing.get_context("spawn")
+        self.processes = processes
+        self.crew_builder = crew_builder
+        self.runner = runner
+        self._manager = self._context.Manager()
+        self._executor = self._new_executor()
+        self._executor_lock = threading.Lock()
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=self._context,
+            initializer=_init_worker,
+            initargs=(self.crew_builder, worker_log_queue()),
+        )
+
+    def _replace_broken(self, broken):
+        """Swaps in new workers for an executor that lost one, unless another run already did."""
+        with self._executor_lock:
+            if self._executor is broken:
+                logger.warning("⚠️ A crew worker died, restarting the crew worker pool")
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._new_executor()
+
+    def warm(self):
+        """Starts every worker and waits until each has loaded the crew's libraries."""
+        barrier = self._manager.Barrier(self.processes)
+        futures = [self._executor.submit(_warm_worker, barrier) for _ in range(self.processes)]
+        return [future.result() for future in futures]
+
+    def run(self, topic, progress=None, **options):
+        """Runs a topic on the next free worker, relaying its progress events.
+
+        If a worker dies (e.g. killed for running out of memory) the pool is
+        restarted and the run tried once more.
+        """
+        executor = self._executor
+        try:
+            return self._run_on(executor, topic, progress, options)
+        except BrokenProcessPool:
+            self._replace_broken(executor)
+            return self._run_on(self._executor, topic, progress, options)
+
+    def _run_on(self, executor, topic, progress, options):
+        events = self._manager.Queue()
+        future = executor.submit(_run_in_worker, self.runner, topic, events, options)
+
+        while True:
+            try:
+                item = events.get(timeout=1)
+            except queue.Empty:
+                if future.done():
+                    break  # The worker died before signalling the end of its events
+                continue
+            if item is None:
+                break
+            if progress is not None:
+                progress(item[0], **item[1])
+
+        result, spans = future.result()
+        replay_spans(spans)
+        return result
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._manager.shutdown()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_crew_pool(crew_builder, runner):
+    """Returns this process's crew worker pool, or None when CREW_POOL_PROCESSES is 0.
+
+    The pool is created on first use, so a pre-forking WSGI server starts the
+    workers inside each server process rather than in the master.
+    """
+    global _pool
+    if CREW_POOL_PROCESSES <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = CrewWorkerPool(crew_builder, runner)
+                _pool.warm()
+    return _pool
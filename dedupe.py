@@ -0,0 +1,163 @@
+# dedupe.py
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+# Near-duplicate detection settings
+SIMHASH_BITS = 64
+SHINGLE_WORDS = 3           # Words per shingle hashed into the fingerprint
+LSH_BANDS = 8               # 8-bit bands; pages within MAX_DISTANCE bits always share one
+MAX_DISTANCE = 7            # Fingerprints this many bits apart or fewer are duplicates
+FINGERPRINT_PATH = os.path.join("cache", "fingerprints.sqlite3")
+
+_BAND_BITS = SIMHASH_BITS // LSH_BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+_WORD = re.compile(r"\w+")
+
+
+def simhash(text):
+    """Returns the 64-bit SimHash of a text's word shingles."""
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        words = words + [""] * (SHINGLE_WORDS - len(words))
+    shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+    digests = b"".join(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest() for shingle in shingles)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8)).reshape(len(shingles), SIMHASH_BITS)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(shingles)
+    return int("".join("1" if vote > 0 else "0" for vote in votes), 2)
+
+
+def distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+def bands(fingerprint):
+    """Splits a fingerprint into LSH bands of (index, value)."""
+    return [(i, (fingerprint >> (i * _BAND_BITS)) & _BAND_MASK) for i in range(LSH_BANDS)]
+
+
+def _signed(fingerprint):
+    # SQLite integers are signed 64-bit
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def _unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+class FingerprintStore:
+    """Persisted page fingerprints so duplicates are recognised across runs."""
+
+    def __init__(self, path=FINGERPRINT_PATH):
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints (url TEXT PRIMARY KEY, simhash INTEGER NOT NULL, seen_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def lookup(self, urls):
+        """Returns {url: fingerprint} for the URLs fingerprinted in earlier runs."""
+        urls = list(urls)
+        if not urls:
+            return {}
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT url, simhash FROM fingerprints WHERE url IN ({','.join('?' * len(urls))})", urls
+            ).fetchall()
+        return {url: _unsigned(value) for url, value in rows}
+
+    def add(self, fingerprints):
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO fingerprints (url, simhash, seen_at) VALUES (?, ?, ?)",
+                [(url, _signed(fingerprint), now) for url, fingerprint in fingerprints.items()],
+            )
+            self._db.commit()
+
+
+class DuplicateIndex:
+    """In-memory LSH index that maps a fingerprint to the first near-identical one added."""
+
+    def __init__(self):
+        self._buckets = {}
+        self._fingerprints = {}
+
+    def find(self, fingerprint):
+        """Returns the key of an indexed near-duplicate of the fingerprint, or None."""
+        for band in bands(fingerprint):
+            for key in self._buckets.get(band, ()):
+                if distance(fingerprint, self._fingerprints[key]) <= MAX_DISTANCE:
+                    return key
+        return None
+
+    def add(self, key, fingerprint):
+        self._fingerprints[key] = fingerprint
+        for band in bands(fingerprint):
+            self._buckets.setdefault(band, []).append(key)
+
+
+def known_duplicates(urls, store):
+    """Returns the URLs that earlier runs showed to duplicate a better-ranked URL in the list.
+
+    These can be skipped before fetching; ``urls`` must be in ranking order.
+    """
+    known = store.lookup(urls)
+    index, duplicates = DuplicateIndex(), {}
+    for url in urls:
+        if url not in known:
+            continue
+        original = index.find(known[url])
+        if original is None:
+            index.add(url, known[url])
+        else:
+            duplicates[url] = original
+    return duplicates
+
+
+def collapse_near_duplicates(results, store=None):
+    """Keeps the best-ranked copy of each near-duplicate page.
+
+    ``results`` are ranked ``{"url", "text"}`` dicts. Each kept result gains an
+    ``alternates`` list with the URLs of the copies that were dropped. The
+    fingerprints are saved to ``store`` for later runs.
+    """
+    index, kept, fingerprints = DuplicateIndex(), {}, {}
+    for result in results:
+        fingerprint = simhash(result["text"])
+        fingerprints[result["url"]] = fingerprint
+        original = index.find(fingerprint)
+        if original is None:
+            index.add(result["url"], fingerprint)
+            kept[result["url"]] = {**result, "alternates": list(result.get("alternates", []))}
+        else:
+            kept[original]["alternates"].append(result["url"])
+
+    if store is not None:
+        store.add(fingerprints)
+    return list(kept.values())
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_fingerprint_store():
+    """Returns the process-wide fingerprint store, opening it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = FingerprintStore()
+    return _store
@@ -0,0 +1,388 @@
+# doc_index.py
+
+import contextvars
+import functools
+import hashlib
+import importlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from logger_config import logger
+from passage_rank import split_passages
+
+# Local document index settings
+DOC_INDEX_DIR = os.path.join("cache", "doc_index")
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"  # Used when sentence-transformers is installed
+HASH_DIMENSIONS = 1024          # Width of the hashing fallback embedding
+QUERY_BATCH_ROWS = 65536        # Rows scored per block of the memory-mapped matrix
+LOCAL_MIN_SCORE = 0.35          # Cosine similarity a passage needs to count as a local hit with the sentence model...
+HASH_MIN_SCORE = 0.2            # ...and with the hashing fallback, whose scores run lower (on-topic ~0.2-0.35)
+LOCAL_MIN_SOURCES = 3           # Distinct URLs with hits needed to skip the web search
+LOCAL_MAX_AGE = 7 * 24 * 60 * 60   # Seconds after indexing that a passage stops counting as a local hit
+COMPACT_MIN_RETIRED = 1000      # Retired rows tolerated before add_documents compacts...
+COMPACT_RETIRED_RATIO = 0.5     # ...once they are also this share of the matrix
+
+_WORD = re.compile(r"\w+")
+
+_bypass = contextvars.ContextVar("local_index_bypass", default=False)
+
+
+@contextmanager
+def bypass_local_index():
+    """Searches inside the block go to the web; the pages they fetch are still indexed."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def local_index_bypassed():
+    return _bypass.get()
+
+
+@functools.lru_cache(maxsize=200_000)
+def _bucket(feature):
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+    value = int.from_bytes(digest, "little")
+    return value % HASH_DIMENSIONS, 1.0 if value >> 63 else -1.0
+
+
+def _text_hash(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class HashingEmbedder:
+    """Signed feature hashing of words and word pairs; needs no model download."""
+
+    name = f"hashing-{HASH_DIMENSIONS}"
+    dimensions = HASH_DIMENSIONS
+    min_score = HASH_MIN_SCORE
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _WORD.findall(text.lower())
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                column, sign = _bucket(feature)
+                vectors[row, column] += sign
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))  # Damp repeated words
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-9)
+
+
+class SentenceEmbedder:
+    """CPU sentence-transformers model producing normalized embeddings."""
+
+    min_score = LOCAL_MIN_SCORE
+
+    def __init__(self, model=EMBEDDING_MODEL):
+        self._model = importlib.import_module("sentence_transformers").SentenceTransformer(model, device="cpu")
+        self.name = model
+        self.dimensions = self._model.get_sentence_embedding_dimension()
+
+    def embed(self, texts):
+        return self._model.encode(list(texts), batch_size=32, normalize_embeddings=True).astype(np.float32)
+
+
+def default_embedder():
+    """Uses sentence-transformers when installed, otherwise the hashing fallback."""
+    try:
+        return SentenceEmbedder()
+    except Exception:
+        return HashingEmbedder()
+
+
+class DocumentIndex:
+    """Passages of previously extracted pages with their embeddings on disk.
+
+    Embeddings are appended to a float32 matrix that is memory-mapped for
+    queries, and passage metadata lives in SQLite. Re-adding a URL with changed
+    text retires its old rows; ``compact`` rewrites the matrix without them.
+
+    An index is rebuilt when it is opened with a different embedder, except
+    when the default sentence model failed to load and the hashing fallback
+    stood in: then the index is kept but not ``available``, so searches find
+    nothing and nothing is added until the sentence model loads again.
+    """
+
+    def __init__(self, directory=DOC_INDEX_DIR, embedder=None):
+        chosen = embedder is not None
+        self.embedder = embedder or default_embedder()
+        self.available = True
+        self._lock = threading.Lock()
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._matrix = None
+        self._live = None
+        self._added_at = None
+        self._live_version = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(directory, "passages.sqlite3"), check_same_thread=False, timeout=30)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS passages (
+                row INTEGER PRIMARY KEY,
+                url TEXT NOT NULL,
+                text TEXT NOT NULL,
+                live INTEGER NOT NULL DEFAULT 1,
+                added_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS passages_url ON passages (url);
+            CREATE TABLE IF NOT EXISTS documents (url TEXT PRIMARY KEY, text_hash TEXT NOT NULL);
+            """
+        )
+        stored = self._db.execute("SELECT value FROM meta WHERE key = 'embedder'").fetchone()
+        if stored is not None and stored[0] != self.embedder.name:
+            if not chosen and isinstance(self.embedder, HashingEmbedder):
+                logger.warning(
+                    f"⚠️ Document index was built with {stored[0]}, which could not be loaded; "
+                    f"local search is off (delete {directory} to rebuild it with {self.embedder.name})"
+                )
+                self.available = False
+                return
+            logger.info(f"♻️ Document index was built with {stored[0]}, rebuilding for {self.embedder.name}")
+            self._reset()
+        self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('embedder', ?)", (self.embedder.name,))
+        self._db.commit()
+
+    def _reset(self):
+        self._db.execute("DELETE FROM passages")
+        self._db.execute("DELETE FROM documents")
+        if os.path.exists(self._vectors_path):
+            os.remove(self._vectors_path)
+        self._matrix = None
+        self._live = None
+
+    def _rows(self):
+        if not os.path.exists(self._vectors_path):
+            return 0
+        return os.path.getsize(self._vectors_path) // (4 * self.embedder.dimensions)
+
+    def _load_matrix(self):
+        rows = self._rows()
+        if self._matrix is None or self._matrix.shape[0] != rows:
+            self._matrix = (
+                np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.embedder.dimensions))
+                if rows else np.zeros((0, self.embedder.dimensions), dtype=np.float32)
+            )
+        return self._matrix
+
+    def _live_mask(self, rows, max_age=None):
+        """Boolean mask of live rows, those older than ``max_age`` seconds left out.
+
+        The mask is rebuilt only after this or another process changed the index.
+        """
+        version = (rows, self._db.execute("PRAGMA data_version").fetchone()[0])
+        if self._live is None or self._live_version != version:
+            live, added_at = np.zeros(rows, dtype=bool), np.zeros(rows, dtype=np.float64)
+            entries = np.array(self._db.execute("SELECT row, added_at FROM passages WHERE live = 1").fetchall(),
+                               dtype=np.float64).reshape(-1, 2)
+            entries = entries[entries[:, 0] < rows]
+            live[entries[:, 0].astype(np.int64)] = True
+            added_at[entries[:, 0].astype(np.int64)] = entries[:, 1]
+            self._live, self._added_at, self._live_version = live, added_at, version
+        if max_age is None:
+            return self._live
+        return self._live & (self._added_at >= time.time() - max_age)
+
+    def _changed(self, documents):
+        """Leaves out documents whose text is indexed already, e.g. pages served from a cache.
+
+        Their passages count as indexed now, so they keep serving as local hits.
+        """
+        hashes = {doc["url"]: _text_hash(doc["text"]) for doc in documents}
+        if not hashes:
+            return [], hashes
+        with self._lock:
+            stored = dict(self._db.execute(
+                f"SELECT url, text_hash FROM documents WHERE url IN ({','.join('?' * len(hashes))})", list(hashes)
+            ))
+            unchanged = [url for url, text_hash in hashes.items() if stored.get(url) == text_hash]
+            if unchanged:
+                self._db.execute(
+                    f"UPDATE passages SET added_at = ? WHERE live = 1 AND url IN ({','.join('?' * len(unchanged))})",
+                    [time.time()] + unchanged,
+                )
+                self._db.commit()
+                self._live = None
+        return [doc for doc in documents if stored.get(doc["url"]) != hashes[doc["url"]]], hashes
+
+    def add_documents(self, documents):
+        """Indexes the passages of ``{"url", "text"}`` documents, replacing earlier versions.
+
+        Documents whose text did not change since they were indexed are skipped.
+        """
+        if not self.available:
+            return 0
+        documents, hashes = self._changed(documents)
+        passages = [(doc["url"], passage) for doc in documents for passage in split_passages(doc["text"])]
+        if not passages:
+            return 0
+        vectors = self.embedder.embed([text for _, text in passages])
+
+        with self._lock:
+            # The write lock also serializes appends from other processes sharing the index
+            self._db.execute("BEGIN IMMEDIATE")
+            urls = list({url for url, _ in passages})
+            self._db.executemany("UPDATE passages SET live = 0 WHERE url = ?", [(url,) for url in urls])
+
+            first_row = self._rows()
+            with open(self._vectors_path, "ab") as f:
+                f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            now = time.time()
+            self._db.executemany(
+                "INSERT OR REPLACE INTO passages (row, url, text, live, added_at) VALUES (?, ?, ?, 1, ?)",
+                [(first_row + i, url, text, now) for i, (url, text) in enumerate(passages)],
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO documents (url, text_hash) VALUES (?, ?)",
+                [(doc["url"], hashes[doc["url"]]) for doc in documents],
+            )
+            self._db.commit()
+            self._live = None
+
+        stats = self.stats()
+        retired = stats["retired_passages"]
+        if retired >= COMPACT_MIN_RETIRED and retired >= COMPACT_RETIRED_RATIO * (retired + stats["live_passages"]):
+            self.compact()
+        return len(passages)
+
+    @property
+    def min_score(self):
+        """Score a passage needs to count as a local hit, which depends on the embedder."""
+        return self.embedder.min_score
+
+    def search(self, queries, k=10, max_age=None):
+        """Returns, per query, the top-k live passages as ``{"url", "text", "score"}`` dicts.
+
+        Accepts a single query string or a list of them; all queries are
+        scored together, block by block over the memory-mapped matrix.
+        With ``max_age`` only passages indexed within that many seconds count.
+        Scoring runs outside the lock, so a ``compact`` that renumbered the
+        rows meanwhile is detected and the search repeated.
+        """
+        single = isinstance(queries, str)
+        queries = [queries] if single else list(queries)
+        if not self.available:
+            return [] if single else [[] for _ in queries]
+        query_vectors = self.embedder.embed(queries)
+
+        while True:
+            with self._lock:
+                matrix = self._load_matrix()
+                live = self._live_mask(matrix.shape[0], max_age)
+                compactions = self._compactions()
+
+            top_hits = self._top_hits(query_vectors, matrix, live, k)
+
+            with self._lock:
+                if self._compactions() == compactions:
+                    results = [self._passages(hits) for hits in top_hits]
+                    return results[0] if single else results
+
+    def _compactions(self):
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'compactions'").fetchone()
+        return int(row[0]) if row else 0
+
+    def _top_hits(self, query_vectors, matrix, live, k):
+        """Returns, per query vector, the k best live ``(row, score)`` pairs, best first."""
+        best_scores = np.full((len(query_vectors), 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(query_vectors), 0), dtype=np.int64)
+        for start in range(0, matrix.shape[0], QUERY_BATCH_ROWS):
+            block = np.asarray(matrix[start:start + QUERY_BATCH_ROWS])
+            scores = query_vectors @ block.T
+            scores[:, ~live[start:start + block.shape[0]]] = -np.inf
+
+            keep = min(k, scores.shape[1])
+            top = np.argpartition(-scores, keep - 1, axis=1)[:, :keep]
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, top, axis=1)], axis=1)
+            best_rows = np.concatenate([best_rows, top + start], axis=1)
+
+            if best_scores.shape[1] > k:
+                order = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, order, axis=1)
+                best_rows = np.take_along_axis(best_rows, order, axis=1)
+
+        top_hits = []
+        for scores, rows in zip(best_scores, best_rows):
+            order = np.argsort(-scores)
+            top_hits.append([(int(rows[i]), float(scores[i])) for i in order if np.isfinite(scores[i])])
+        return top_hits
+
+    def _passages(self, hits):
+        # Called with the lock held
+        if not hits:
+            return []
+        rows = dict(
+            (row, (url, text)) for row, url, text in self._db.execute(
+                f"SELECT row, url, text FROM passages WHERE row IN ({','.join('?' * len(hits))})",
+                [row for row, _ in hits],
+            )
+        )
+        return [{"url": rows[row][0], "text": rows[row][1], "score": score} for row, score in hits if row in rows]
+
+    def compact(self):
+        """Rewrites the matrix without retired rows and renumbers the passages."""
+        if not self.available:
+            return 0
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            matrix = self._load_matrix()
+            live_rows = [row for (row,) in self._db.execute("SELECT row FROM passages WHERE live = 1 ORDER BY row")]
+            live_rows = [row for row in live_rows if row < matrix.shape[0]]
+
+            temp_path = self._vectors_path + ".tmp"
+            with open(temp_path, "wb") as f:
+                for start in range(0, len(live_rows), QUERY_BATCH_ROWS):
+                    f.write(np.asarray(matrix[live_rows[start:start + QUERY_BATCH_ROWS]]).tobytes())
+
+            self._db.execute("DELETE FROM passages WHERE live = 0")
+            self._db.executemany(
+                "UPDATE passages SET row = ? WHERE row = ?",
+                [(-(new_row + 1), old_row) for new_row, old_row in enumerate(live_rows)],
+            )
+            self._db.execute("UPDATE passages SET row = -row - 1")
+            # Searches that scored the old numbering see the change and start over
+            self._db.execute(
+                "INSERT INTO meta (key, value) VALUES ('compactions', '1') "
+                "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+            )
+
+            os.replace(temp_path, self._vectors_path)
+            self._db.commit()
+            self._matrix = None
+            self._live = None
+            return len(live_rows)
+
+    def stats(self):
+        with self._lock:
+            live, total = self._db.execute("SELECT COALESCE(SUM(live), 0), COUNT(*) FROM passages").fetchone()
+        return {"embedder": self.embedder.name, "available": self.available, "live_passages": live,
+                "retired_passages": total - live}
+
+
+def sufficient_local_recall(hits, min_score, min_sources=LOCAL_MIN_SOURCES):
+    """Checks whether local hits of at least ``min_score`` cover enough distinct sources to skip the web."""
+    return len({hit["url"] for hit in hits if hit["score"] >= min_score}) >= min_sources
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_doc_index():
+    """Returns the process-wide document index, opening it on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = DocumentIndex()
+    return _index
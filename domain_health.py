@@ -0,0 +1,243 @@
+# domain_health.py
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+# Domain health settings
+DOMAIN_HEALTH_PATH = os.path.join("cache", "domain_health.sqlite3")
+URL_FAILURE_TTL = 60 * 60                   # Seconds a URL that failed transiently (timeout, 5xx) is skipped
+URL_GONE_TTL = 24 * 60 * 60                 # Seconds a URL answering 401/403/404/410/451 is skipped
+GONE_STATUSES = frozenset([401, 403, 404, 410, 451])
+PAGE_ONLY_STATUSES = frozenset([403, 404, 410])  # The server is fine, only the page is refused or missing: no strike
+BREAKER_FAILURES = 3                        # Consecutive failures that open a domain's circuit
+BREAKER_COOLDOWN = 15 * 60                  # Seconds an open circuit skips the domain before one probe...
+BREAKER_MAX_COOLDOWN = 6 * 60 * 60          # ...doubling after every failed probe up to this
+TIMEOUT_LATENCY_FACTOR = 4                  # Timeout is this multiple of the domain's typical response time...
+TIMEOUT_MIN = 3                             # ...but never below this many seconds, nor above the caller's timeout
+LATENCY_SMOOTHING = 0.3                     # Weight of the newest response time in the moving average
+
+
+class DomainUnavailable(Exception):
+    """Raised instead of fetching a URL that recently failed or whose domain's circuit is open."""
+
+
+@dataclass
+class DomainState:
+    """Observed health of one host."""
+
+    failures: int = 0          # Consecutive failures
+    open_until: float = 0.0    # While in the future, the domain is skipped
+    cooldown: float = BREAKER_COOLDOWN
+    latency: float = None      # Moving average of seconds until response headers
+    successes: int = 0
+    total_failures: int = 0
+
+    @property
+    def open(self):
+        return self.failures >= BREAKER_FAILURES
+
+
+def host_of(url):
+    return urlparse(url).netloc.lower()
+
+
+class DomainHealth:
+    """Per-domain failure tracking, persisted in SQLite so it carries over between runs.
+
+    * Negative cache: a URL that failed is skipped for URL_FAILURE_TTL, or
+      URL_GONE_TTL if the server refused it or said it does not exist.
+    * Circuit breaker: after BREAKER_FAILURES consecutive failures a domain is
+      skipped for a cooldown. Then a single probe request is let through;
+      success closes the circuit, failure reopens it with a doubled cooldown.
+    * Adaptive timeouts: requests to a domain get a timeout derived from its
+      moving-average response time instead of the caller's fixed timeout. A
+      request that outran only that narrower timeout is not held against the
+      URL or the domain.
+
+    State is kept in memory and written through, so checks never touch disk.
+    """
+
+    def __init__(self, path=DOMAIN_HEALTH_PATH):
+        self._lock = threading.Lock()
+        self._probing = set()
+        self._stats = {"skipped_urls": 0, "skipped_domains": 0, "probes": 0, "failures": 0, "successes": 0}
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS domains (
+                host TEXT PRIMARY KEY,
+                failures INTEGER NOT NULL,
+                open_until REAL NOT NULL,
+                cooldown REAL NOT NULL,
+                latency REAL,
+                successes INTEGER NOT NULL,
+                total_failures INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS failed_urls (
+                url TEXT PRIMARY KEY,
+                reason TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            """
+        )
+        now = time.time()
+        self._db.execute("DELETE FROM failed_urls WHERE expires_at <= ?", (now,))
+        self._db.commit()
+        self._domains = {
+            row[0]: DomainState(*row[1:])
+            for row in self._db.execute(
+                "SELECT host, failures, open_until, cooldown, latency, successes, total_failures FROM domains"
+            )
+        }
+        self._failed_urls = {
+            row[0]: (row[1], row[2]) for row in self._db.execute("SELECT url, reason, expires_at FROM failed_urls")
+        }
+
+    def check(self, url):
+        """Raises DomainUnavailable if the URL should not be fetched right now."""
+        now = time.time()
+        host = host_of(url)
+        with self._lock:
+            failed = self._failed_urls.get(url)
+            if failed is not None:
+                if failed[1] > now:
+                    self._stats["skipped_urls"] += 1
+                    raise DomainUnavailable(f"recently failed ({failed[0]}), retried in {int(failed[1] - now)}s")
+                del self._failed_urls[url]
+
+            state = self._domains.get(host)
+            if state is None or not state.open:
+                return
+            if state.open_until > now or host in self._probing:
+                self._stats["skipped_domains"] += 1
+                raise DomainUnavailable(f"{host} failed {state.failures} times in a row, circuit open")
+            # Cooldown over: this request is the probe, concurrent ones keep skipping
+            self._probing.add(host)
+            self._stats["probes"] += 1
+
+    def timeout_for(self, url, timeout):
+        """Narrows the caller's timeout to what the domain usually needs."""
+        with self._lock:
+            state = self._domains.get(host_of(url))
+            latency = state.latency if state is not None else None
+        if latency is None:
+            return timeout
+        return min(timeout, max(TIMEOUT_MIN, latency * TIMEOUT_LATENCY_FACTOR))
+
+    def record_success(self, url, latency):
+        host = host_of(url)
+        with self._lock:
+            state = self._domains.setdefault(host, DomainState())
+            state.latency = latency if state.latency is None else \
+                LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * state.latency
+            state.failures, state.open_until, state.cooldown = 0, 0.0, BREAKER_COOLDOWN
+            state.successes += 1
+            self._probing.discard(host)
+            self._stats["successes"] += 1
+            self._save(host, state)
+
+    def record_failure(self, url, reason, status=None, timed_out=False, timeout_narrowed=False):
+        """Adds the URL to the negative cache and counts a failure against its domain.
+
+        A timeout also doubles the domain's expected response time, so the next
+        request to it is given longer. When ``timeout_narrowed`` (timeout_for()
+        cut the caller's timeout) that is all a timeout does: the caller's own
+        timeout might have been enough. Returns whether the domain's circuit is open.
+        """
+        now = time.time()
+        host = host_of(url)
+        with self._lock:
+            if timed_out and timeout_narrowed:
+                state = self._domains.setdefault(host, DomainState())
+                self._probing.discard(host)
+                if state.latency is not None:
+                    state.latency *= 2
+                    self._save(host, state)
+                return state.open
+
+            reason = f"HTTP {status}" if status is not None else reason
+            expires_at = now + (URL_GONE_TTL if status in GONE_STATUSES else URL_FAILURE_TTL)
+            self._failed_urls[url] = (reason, expires_at)
+            self._db.execute(
+                "INSERT OR REPLACE INTO failed_urls (url, reason, expires_at) VALUES (?, ?, ?)",
+                (url, reason, expires_at),
+            )
+
+            state = self._domains.setdefault(host, DomainState())
+            probe = host in self._probing
+            self._probing.discard(host)
+            if status in PAGE_ONLY_STATUSES:
+                state.failures, state.open_until, state.cooldown = 0, 0.0, BREAKER_COOLDOWN
+            else:
+                state.failures += 1
+                state.total_failures += 1
+                if probe:
+                    state.cooldown = min(state.cooldown * 2, BREAKER_MAX_COOLDOWN)
+                if state.open:
+                    state.open_until = now + state.cooldown
+                if timed_out and state.latency is not None:
+                    state.latency *= 2
+            self._stats["failures"] += 1
+            self._save(host, state)
+            return state.open
+
+    def release_probe(self, url):
+        """Frees a probe slot that ended without telling anything about the domain, e.g. an oversized page."""
+        with self._lock:
+            self._probing.discard(host_of(url))
+
+    def _save(self, host, state):
+        self._db.execute(
+            "INSERT OR REPLACE INTO domains "
+            "(host, failures, open_until, cooldown, latency, successes, total_failures, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (host, state.failures, state.open_until, state.cooldown, state.latency, state.successes,
+             state.total_failures, time.time()),
+        )
+        self._db.commit()
+
+    def reset(self, host=None):
+        """Forgets the failures of one host, or of every host."""
+        with self._lock:
+            if host is None:
+                self._domains.clear()
+                self._failed_urls.clear()
+                self._db.execute("DELETE FROM domains")
+                self._db.execute("DELETE FROM failed_urls")
+            else:
+                self._domains.pop(host, None)
+                self._failed_urls = {url: entry for url, entry in self._failed_urls.items() if host_of(url) != host}
+                self._db.execute("DELETE FROM domains WHERE host = ?", (host,))
+                self._db.execute("DELETE FROM failed_urls WHERE url LIKE ?", (f"%://{host}/%",))
+            self._db.commit()
+
+    def stats(self):
+        """Returns skip and failure counters plus the domains whose circuit is open."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["open_domains"] = sorted(host for host, state in self._domains.items() if state.open)
+            stats["failed_urls"] = len(self._failed_urls)
+        return stats
+
+
+_domain_health = None
+_domain_health_lock = threading.Lock()
+
+
+def get_domain_health():
+    """Returns the process-wide domain health tracker, opening it on first use."""
+    global _domain_health
+    if _domain_health is None:
+        with _domain_health_lock:
+            if _domain_health is None:
+                _domain_health = DomainHealth()
+    return _domain_health
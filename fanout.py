@@ -0,0 +1,136 @@
+# fanout.py
+
+import contextvars
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from compaction import strip_reasoning
+from logger_config import logger
+from metrics import span
+from web_search import search_local_first
+
+# Fan-out settings
+FANOUT_ENABLED = os.environ.get("URIEL_FANOUT", "1") != "0"  # Set URIEL_FANOUT=0 to let the researcher agent search
+FANOUT_SUBQUERIES = 4        # Searches per topic, the topic itself included
+FANOUT_RESULTS_PER_QUERY = 5
+FANOUT_MAX_SOURCES = 12      # Distinct pages turned into notes per topic
+NOTE_SOURCE_TOKENS = 1200    # Approximate tokens of a page the note-taking model reads
+NOTE_WORKERS = 4             # Sources summarized at the same time
+NOTE_MAX_BULLETS = 6
+
+# Shared by every run so the limits hold across concurrent runs
+_search_executor = ThreadPoolExecutor(max_workers=FANOUT_SUBQUERIES * 2, thread_name_prefix="fanout")
+_note_executor = ThreadPoolExecutor(max_workers=NOTE_WORKERS, thread_name_prefix="notes")
+
+_LIST_MARKER = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s*")
+NOTHING_RELEVANT = "NOTHING RELEVANT"
+
+PLAN_PROMPT = (
+    "Break the research topic below into {count} web search queries that each cover a different aspect "
+    "(e.g. recent developments, applications, limitations, key players). "
+    "Answer with the queries only, one per line.\n\nTopic: {topic}"
+)
+NOTE_PROMPT = (
+    "Topic: {topic}\nSource: {url}\n\n{excerpt}\n\n"
+    "Write at most {bullets} short bullet points with the facts, figures, dates and claims from this source "
+    "that matter for the topic. Use only what the source says. "
+    "If it says nothing relevant, answer " + NOTHING_RELEVANT + "."
+)
+# Used when the model does not come up with enough queries
+FALLBACK_ASPECTS = ("latest developments", "applications and use cases", "challenges and limitations",
+                    "key companies and research groups", "future outlook")
+
+
+def _submit(executor, fn, *args):
+    # Tasks run in a copy of the caller's context, so they use its run store and join its trace
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+def plan_subqueries(topic, llm, count=FANOUT_SUBQUERIES):
+    """Returns ``count`` search queries for the topic, the topic itself first."""
+    queries = [topic]
+    try:
+        with span("fanout", "plan"):
+            answer = strip_reasoning(llm.invoke(PLAN_PROMPT.format(count=count - 1, topic=topic)).content)
+        for line in answer.splitlines():
+            query = _LIST_MARKER.sub("", line).strip().strip('"')
+            if query and query.lower() not in {q.lower() for q in queries}:
+                queries.append(query)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not plan sub-queries for '{topic}': {e}")
+
+    for aspect in FALLBACK_ASPECTS:
+        if len(queries) >= count:
+            break
+        queries.append(f"{topic} {aspect}")
+    return queries[:count]
+
+
+def gather_sources(queries, num_results=FANOUT_RESULTS_PER_QUERY, max_sources=FANOUT_MAX_SOURCES):
+    """Runs the searches concurrently and merges their pages, taking the best-ranked page of each query in turn.
+
+    Like the researcher's tool, each query is answered from the local document index when it covers the query.
+    """
+    futures = [_submit(_search_executor, search_local_first, query, num_results) for query in queries]
+    rankings = []
+    for query, future in zip(queries, futures):
+        try:
+            rankings.append(future.result()[0])
+        except Exception as e:
+            logger.error(f"❌ Sub-query search failed for '{query}': {e}")
+
+    sources, seen = [], set()
+    for rank in range(max((len(ranking) for ranking in rankings), default=0)):
+        for ranking in rankings:
+            if rank < len(ranking) and ranking[rank]["url"] not in seen:
+                seen.add(ranking[rank]["url"])
+                sources.append(ranking[rank])
+    return sources[:max_sources]
+
+
+def take_notes(topic, source, llm):
+    """Condenses one source into bullet-point notes on the topic; returns None if it has nothing relevant."""
+    from passage_rank import select_passages  # Loads NumPy
+
+    passages = select_passages(topic, [source], NOTE_SOURCE_TOKENS)
+    excerpt = "\n\n".join(passage["text"] for passage in passages)
+    with span("fanout", "notes", url=source["url"]):
+        prompt = NOTE_PROMPT.format(topic=topic, url=source["url"], excerpt=excerpt, bullets=NOTE_MAX_BULLETS)
+        notes = strip_reasoning(llm.invoke(prompt).content)
+    return None if not notes or NOTHING_RELEVANT in notes.upper() else notes
+
+
+def research_notes(topic, llm=None):
+    """Researches a topic by fan-out: plan sub-queries, search them concurrently, take notes per source in parallel.
+
+    Returns the notes as one document with a ``Source:`` line per page, which
+    is all the analyze and summarize tasks get to see.
+    """
+    if llm is None:
+        from agents import build_llm
+        llm = build_llm("notes", stream_tokens=False)
+    queries = plan_subqueries(topic, llm)
+    logger.info(f"🪭 Fanning out '{topic}' into {len(queries)} searches: {queries}")
+
+    with span("fanout", "search"):
+        sources = gather_sources(queries)
+    if not sources:
+        return f"No sources were found for {topic}."
+
+    futures = [_submit(_note_executor, take_notes, topic, source, llm) for source in sources]
+    notes = []
+    for source, future in zip(sources, futures):
+        try:
+            text = future.result()
+        except Exception as e:
+            logger.error(f"❌ Could not take notes on {source['url']}: {e}")
+            continue
+        if text:
+            alternates = source.get("alternates") or []
+            also = f" (also published at: {', '.join(alternates)})" if alternates else ""
+            notes.append(f"Source: {source['url']}{also}\n{text}")
+
+    logger.info(f"🗒️ Notes from {len(notes)} of {len(sources)} sources for '{topic}'")
+    header = f"Research notes on {topic}, from searches for: {'; '.join(queries)}"
+    return "\n\n".join([header] + notes) if notes else f"No relevant sources were found for {topic}."
@@ -0,0 +1,146 @@
+# html_extract.py
+
+"""Main-text extraction from HTML with pluggable parser backends.
+
+Every backend applies the same rules as the original BeautifulSoup code: take
+the first ``<article>``, else the first ``div.content``, else ``<body>``; keep
+the ``<p>`` elements inside it whose stripped text is longer than 30
+characters, and join them with spaces. Each paragraph's text is computed once.
+
+Backends, fastest first: ``selectolax`` and ``lxml`` when installed, and
+``html.parser`` through BeautifulSoup, which is always available.
+
+Bodies are decoded with ``decode_html`` first, so every backend sees the same
+text whatever charset the page was served in.
+"""
+
+import codecs
+import importlib
+import re
+
+MIN_PARAGRAPH_CHARS = 30
+MIN_TEXT_CHARS = 100
+
+_HEADER_CHARSET = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.I)
+_META_CHARSET = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?([\w.:-]+)", re.I)
+# Browsers read these labels as windows-1252, which only adds characters in 0x80-0x9F
+_WINDOWS_1252_LABELS = {"iso-8859-1", "iso8859-1", "latin-1", "latin1", "us-ascii", "ascii"}
+
+
+def _codec(label):
+    if not label:
+        return None
+    label = label.decode("ascii", "ignore") if isinstance(label, bytes) else label
+    label = "cp1252" if label.lower() in _WINDOWS_1252_LABELS else label
+    try:
+        return codecs.lookup(label).name
+    except LookupError:
+        return None
+
+
+def decode_html(body, content_type=""):
+    """Decodes an HTML body the way a browser would pick its charset.
+
+    The charset of the Content-Type header wins, then a ``<meta charset>`` in
+    the first bytes; unlabelled pages are read as UTF-8 when they are valid
+    UTF-8 and as windows-1252 otherwise. A multi-byte character cut off at
+    the end of a truncated body is dropped.
+    """
+    header = _HEADER_CHARSET.search(content_type or "")
+    meta = _META_CHARSET.search(body[:4096])
+    encoding = _codec(header and header.group(1)) or _codec(meta and meta.group(1))
+    if encoding is not None:
+        return body.decode(encoding, errors="replace")
+    try:
+        return codecs.getincrementaldecoder("utf-8")().decode(body, final=False)
+    except UnicodeDecodeError:
+        return body.decode("cp1252", errors="replace")
+
+
+def _selectolax_paragraphs(html):
+    LexborHTMLParser = importlib.import_module("selectolax.lexbor").LexborHTMLParser
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(["script", "style"])  # BeautifulSoup's get_text skips their contents too
+    main = tree.css_first("article") or tree.css_first("div.content") or tree.body
+    if main is None:
+        return []
+    return [p.text(deep=True, separator="", strip=True) for p in main.css("p")]
+
+
+def _lxml_paragraphs(html):
+    lxml_html = importlib.import_module("lxml.html")
+    try:
+        if isinstance(html, str):
+            # lxml refuses str with an XML encoding declaration; an explicit encoding also overrides <meta charset>
+            root = lxml_html.document_fromstring(html.encode("utf-8"), parser=lxml_html.HTMLParser(encoding="utf-8"))
+        else:
+            root = lxml_html.document_fromstring(html)
+    except Exception:
+        return []  # lxml refuses empty or unparseable documents
+
+    def first(xpath):
+        found = root.xpath(xpath)
+        return found[0] if found else None
+
+    main = first("//article")
+    if main is None:
+        main = first("//div[contains(concat(' ', normalize-space(@class), ' '), ' content ')]")
+    if main is None:
+        main = first("//body")
+    if main is None:
+        return []
+    importlib.import_module("lxml.etree").strip_elements(main, "script", "style", with_tail=False)
+    return ["".join(piece.strip() for piece in p.itertext()) for p in main.iter("p")]
+
+
+def _html_parser_paragraphs(html):
+    BeautifulSoup = importlib.import_module("bs4").BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    main = soup.find("article") or soup.find("div", class_="content") or soup.body
+    if main is None:
+        return []
+    return [p.get_text(strip=True) for p in main.find_all("p")]
+
+
+BACKENDS = {
+    "selectolax": _selectolax_paragraphs,
+    "lxml": _lxml_paragraphs,
+    "html.parser": _html_parser_paragraphs,
+}
+
+# Modules whose presence enables a backend
+_BACKEND_MODULES = {"selectolax": "selectolax.lexbor", "lxml": "lxml.html", "html.parser": "bs4"}
+
+
+def available_backends():
+    """Names of the backends whose libraries can be imported, fastest first."""
+    names = []
+    for name, module in _BACKEND_MODULES.items():
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+_default_backend = None
+
+
+def default_backend():
+    """The fastest installed backend; chosen once per process."""
+    global _default_backend
+    if _default_backend is None:
+        _default_backend = available_backends()[0]
+    return _default_backend
+
+
+def extract_main_text(html, backend=None):
+    """Returns the joined main-content paragraphs of an HTML document.
+
+    Pass text decoded by ``decode_html``; bytes are left to each backend's own
+    charset detection, which differs between them.
+    """
+    paragraphs = BACKENDS[backend or default_backend()](html)
+    text = " ".join(text for text in paragraphs if len(text) > MIN_PARAGRAPH_CHARS)
+    return text if len(text) > MIN_TEXT_CHARS else "No meaningful text found."
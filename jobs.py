@@ -0,0 +1,195 @@
+# jobs.py
+
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from search_cache import normalize_query
+
+# Job settings
+JOB_WORKERS = 2           # Research runs executed at the same time
+JOB_MAX_QUEUE = 8         # Jobs allowed to wait for a worker before submissions are refused
+JOB_RETENTION = 60 * 60   # Seconds finished jobs stay queryable
+JOB_RESULT_WINDOW = 120   # Seconds a successful result answers repeat submissions of its topic
+SSE_HEARTBEAT = 15        # Seconds between keep-alive comments on idle event streams
+
+
+class QueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class Job:
+    """A research run and the ordered log of events it has produced."""
+
+    def __init__(self, topic, options=None):
+        self.id = uuid.uuid4().hex
+        self.topic = topic
+        self.options = options or {}
+        self.key = normalize_query(topic)
+        self.requests = 1
+        self.status = "queued"
+        self.stage = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.first_token_at = None
+        self.finished_at = None
+        self._events = []
+        self._changed = threading.Condition()
+
+    @property
+    def done(self):
+        return self.status in ("succeeded", "failed")
+
+    def emit(self, event, **data):
+        """Appends an event to the job log and wakes any stream waiting on it."""
+        with self._changed:
+            if event == "stage":
+                self.stage = data.get("stage")
+            elif event == "token" and self.first_token_at is None:
+                self.first_token_at = time.time()
+            self._events.append({"event": event, "time": time.time(), **data})
+            self._changed.notify_all()
+
+    def events_since(self, index, timeout=None):
+        """Returns events after ``index``, waiting up to ``timeout`` for new ones."""
+        with self._changed:
+            if index >= len(self._events) and not self.done:
+                self._changed.wait(timeout)
+            return self._events[index:]
+
+    def wait(self, timeout=None):
+        """Blocks until the job finishes; returns whether it did."""
+        with self._changed:
+            return self._changed.wait_for(lambda: self.done, timeout)
+
+    def finish(self, result=None, error=None):
+        with self._changed:
+            self.result = result
+            self.error = error
+            self.status = "failed" if error else "succeeded"
+            self.finished_at = time.time()
+            self._events.append({"event": "done", "time": self.finished_at, "status": self.status,
+                                 "result": result or {"status": "error", "error": error}})
+            self._changed.notify_all()
+
+    @property
+    def time_to_first_token(self):
+        if self.first_token_at is None or self.started_at is None:
+            return None
+        return self.first_token_at - self.started_at
+
+    def to_dict(self):
+        return {
+            "jobId": self.id,
+            "topic": self.topic,
+            "status": self.status,
+            "requests": self.requests,
+            "stage": self.stage,
+            "error": self.error,
+            "createdAt": self.created_at,
+            "timeToFirstToken": self.time_to_first_token,
+            "finishedAt": self.finished_at,
+        }
+
+
+class JobManager:
+    """Runs research jobs on a bounded worker pool.
+
+    ``runner`` is called as ``runner(topic, progress, **options)`` on a worker
+    thread, where ``progress(event, **data)`` records an event on the job and
+    ``options`` are the keyword arguments given to ``submit``. It returns the
+    result dict; a result with ``"status": "error"`` marks the job failed.
+
+    Submissions whose normalized topic matches a queued or running job attach
+    to that job, and a successful job keeps answering its topic for
+    ``result_window`` seconds after it finishes, unless ``refresh`` is set.
+    """
+
+    def __init__(self, runner, workers=JOB_WORKERS, max_queue=JOB_MAX_QUEUE, retention=JOB_RETENTION,
+                 result_window=JOB_RESULT_WINDOW):
+        self.runner = runner
+        self.max_queue = max_queue
+        self.retention = retention
+        self.result_window = result_window
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._workers = workers
+        self._jobs = {}
+        self._jobs_by_key = {}
+        self._lock = threading.Lock()
+
+    def submit(self, topic, **options):
+        """Queues a research job, or joins a matching one, and returns it.
+
+        Raises QueueFull when a new job is needed but the queue is at capacity.
+        """
+        with self._lock:
+            self._prune()
+            existing = self._jobs_by_key.get(normalize_query(topic))
+            if existing is not None and self._reusable(existing, options.get("refresh", False)):
+                existing.requests += 1
+                existing.emit("joined", topic=topic, requests=existing.requests)
+                return existing
+
+            waiting = sum(1 for job in self._jobs.values() if not job.done)
+            if waiting >= self._workers + self.max_queue:
+                raise QueueFull(f"{waiting} jobs already queued or running")
+
+            job = Job(topic, options)
+            self._jobs[job.id] = job
+            self._jobs_by_key[job.key] = job
+
+        job.emit("queued", topic=topic)
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job):
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            result = self.runner(job.topic, job.emit, **job.options)
+        except Exception as e:
+            job.finish(error=str(e))
+            return
+
+        if isinstance(result, dict) and result.get("status") == "error":
+            job.finish(result=result, error=result.get("error", "Research failed"))
+        else:
+            job.finish(result=result)
+
+    def _reusable(self, job, refresh):
+        if not job.done:
+            return True
+        if refresh:
+            return False
+        return job.status == "succeeded" and time.time() - job.finished_at < self.result_window
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.done and job.finished_at < cutoff]:
+            job = self._jobs.pop(job_id)
+            if self._jobs_by_key.get(job.key) is job:
+                del self._jobs_by_key[job.key]
+
+
+def sse_stream(job, heartbeat=SSE_HEARTBEAT):
+    """Yields a job's events as Server-Sent Events until the job finishes."""
+    index = 0
+    while True:
+        events = job.events_since(index, timeout=heartbeat)
+        if not events:
+            yield ": keep-alive\n\n"
+            continue
+
+        for event in events:
+            index += 1
+            yield f"id: {index}\nevent: {event['event']}\ndata: {json.dumps(event)}\n\n"
+            if event["event"] == "done":
+                return
@@ -0,0 +1,38 @@
+# lazy_imports.py
+
+"""Accessors for heavy dependencies that are only imported on first use.
+
+Importing ``web_search`` used to load spaCy, selenium, pdfplumber and friends
+up front, which every process paid for even when a request never touched
+them. Each accessor below imports its dependency the first time it is called;
+later calls are served from ``sys.modules`` or a cached instance.
+"""
+
+import importlib
+import threading
+
+_nlp = None
+_nlp_lock = threading.Lock()
+
+
+def pdfplumber():
+    return importlib.import_module("pdfplumber")
+
+
+def ddgs():
+    return importlib.import_module("duckduckgo_search").DDGS
+
+
+def text_blob():
+    return importlib.import_module("textblob").TextBlob
+
+
+def spacy_nlp(model="en_core_web_sm"):
+    """Returns the shared spaCy pipeline, loading it on first use."""
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                _nlp = importlib.import_module("spacy").load(model)
+    return _nlp
+
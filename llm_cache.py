@@ -0,0 +1,154 @@
+# llm_cache.py
+
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+# LLM response cache settings
+LLM_CACHE_PATH = os.path.join("cache", "llm_responses.sqlite3")
+LLM_CACHE_MAX_ENTRIES = 5000                                    # Responses kept before LRU eviction
+LLM_CACHE_ENABLED = os.environ.get("URIEL_LLM_CACHE", "1") != "0"  # Set URIEL_LLM_CACHE=0 to bypass
+
+_bypass = contextvars.ContextVar("llm_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_llm_cache():
+    """Skips cache lookups inside the block; fresh responses still replace old ones."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+class ResponseStore:
+    """SQLite table of serialized LLM generations shared by every ResponseCache."""
+
+    def __init__(self, path=LLM_CACHE_PATH, max_entries=LLM_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._stats = {"hits": 0, "misses": 0, "bypassed": 0, "stores": 0, "evictions": 0, "seconds_saved": 0.0}
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, generations TEXT NOT NULL, latency REAL NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._db.commit()
+
+    def lookup(self, key, bypass=False):
+        with self._lock:
+            if bypass:
+                self._stats["bypassed"] += 1
+                self._pending[key] = time.monotonic()
+                return None
+
+            row = self._db.execute("SELECT generations, latency FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                self._pending[key] = time.monotonic()
+                return None
+
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            self._stats["hits"] += 1
+            self._stats["seconds_saved"] += row[1]
+        return [loads(generation) for generation in json.loads(row[0])]
+
+    def update(self, key, generations):
+        data = json.dumps([dumps(generation) for generation in generations])
+        now = time.time()
+        with self._lock:
+            started = self._pending.pop(key, None)
+            latency = time.monotonic() - started if started is not None else 0.0
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, generations, latency, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, data, latency, now, now),
+            )
+            self._stats["stores"] += 1
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        excess = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+            self._stats["evictions"] += excess
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+class ResponseCache(BaseCache):
+    """LangChain cache that replays stored responses for identical LLM calls.
+
+    The key combines the namespace (model and base URL), LangChain's
+    ``llm_string`` (model class and sampling parameters) and the serialized
+    prompt messages. Pass an instance as ``cache=`` when building a chat model.
+    """
+
+    def __init__(self, namespace="", store=None, bypass=False):
+        self.namespace = namespace
+        self.store = store or get_response_store()
+        self.bypass = bypass
+
+    def _key(self, prompt, llm_string):
+        return hashlib.sha256("\x1f".join((self.namespace, llm_string, prompt)).encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt, llm_string):
+        bypass = self.bypass or _bypass.get() or not LLM_CACHE_ENABLED
+        return self.store.lookup(self._key(prompt, llm_string), bypass=bypass)
+
+    def update(self, prompt, llm_string, return_val):
+        self.store.update(self._key(prompt, llm_string), return_val)
+
+    def clear(self, **kwargs):
+        self.store.clear()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_response_store():
+    """Returns the process-wide response store, opening it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ResponseStore()
+    return _store
+
+
+def response_cache_for(model, base_url):
+    """Returns a cache namespaced to one model served from one endpoint."""
+    return ResponseCache(namespace=f"{base_url}|{model}")
@@ -1,23 +1,134 @@
 import os
+import json
+import queue
+import atexit
 import logging
+import multiprocessing
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-# Set up logging configuration
-log_directory = 'logs'
-os.makedirs(log_directory, exist_ok=True)
-
-# Clear existing handlers to prevent duplicates
-for handler in logging.root.handlers[:]:
-    logging.root.removeHandler(handler)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(log_directory, 'research_summary.log'), mode='a'),
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger(__name__)
+# Logging settings
+LOG_DIRECTORY = 'logs'
+LOG_FILE = os.path.join(LOG_DIRECTORY, 'research_summary.log')
+LOG_LEVEL = os.environ.get("URIEL_LOG_LEVEL", "INFO")
+LOG_FORMAT = os.environ.get("URIEL_LOG_FORMAT", "text")  # "json" writes one JSON object per line
+LOG_MAX_BYTES = 10 * 1024 * 1024   # The log file is rotated once it reaches this size...
+LOG_BACKUP_COUNT = 5               # ...keeping this many older files
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_listener = None
+_worker_queue = None      # Records from worker processes, see worker_log_queue()
+_worker_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as a single-line JSON object."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _InProcessQueueHandler(QueueHandler):
+    """Queues records as they are; formatting happens on the listener thread.
+
+    The stock QueueHandler formats each record on the calling thread so it can
+    be pickled. The queue here never leaves the process, so that is skipped.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class _ForwardHandler(logging.Handler):
+    """Hands a record from a worker process to this process's loggers."""
+
+    def emit(self, record):
+        logging.getLogger(record.name).handle(record)
+
+
+def setup_logging(level=LOG_LEVEL, log_format=LOG_FORMAT, log_file=LOG_FILE, console=True):
+    """Sends all logging through a queue to a background thread that writes the file and console.
+
+    Log calls only put the record on the queue, so they never wait for disk or
+    terminal I/O; messages are formatted on the background thread too. The
+    file is rotated by size. Calling this again replaces the
+    previous configuration.
 
-# Log initial message to confirm logging works
-logger.info("Logging system initialized")
+    Only the process that owns the log file calls this, from its entry point;
+    worker processes use setup_worker_logging() instead, as several processes
+    rotating one file lose records.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    if os.path.dirname(log_file):
+        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    formatter = JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT)
+    handlers = [RotatingFileHandler(log_file, mode='a', maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT,
+                                    encoding='utf-8')]
+    if console:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    # Clear existing handlers to prevent duplicates
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+
+    log_queue = queue.SimpleQueue()
+    root.addHandler(_InProcessQueueHandler(log_queue))
+    root.setLevel(level)
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    # Log initial message to confirm logging works
+    logger.info("Logging system initialized")
+    return _listener
+
+
+def worker_log_queue():
+    """Returns the queue worker processes send their records through; pass it to setup_worker_logging().
+
+    Its records are logged here, in the process that called setup_logging().
+    """
+    global _worker_queue, _worker_listener
+    if _worker_queue is None:
+        _worker_queue = multiprocessing.get_context("spawn").Queue()
+        _worker_listener = QueueListener(_worker_queue, _ForwardHandler())
+        _worker_listener.start()
+    return _worker_queue
+
+
+def setup_worker_logging(log_queue, level=LOG_LEVEL):
+    """Sends a worker process's records to the parent through ``log_queue``, from worker_log_queue()."""
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
+
+
+def stop_logging():
+    """Writes out the records still queued and stops the background threads."""
+    global _listener, _worker_queue, _worker_listener
+    if _worker_listener is not None:
+        _worker_listener.stop()
+        _worker_queue = _worker_listener = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
+logger = logging.getLogger(__name__)
@@ -0,0 +1,212 @@
+# metrics.py
+
+import bisect
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Metrics settings
+SPAN_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+TOKEN_RATE_BUCKETS = (1, 2, 5, 10, 20, 35, 50, 75, 100, 150, 200, 300, 500)
+TRACE_DUMPS = os.environ.get("URIEL_TRACE_DUMPS", "0") == "1"  # Save a .trace.json next to each research output
+
+# Traces collecting the spans finished in the current context, innermost last
+_traces = contextvars.ContextVar("traces", default=())
+
+
+class Histogram:
+    """A Prometheus histogram with a fixed set of label names."""
+
+    def __init__(self, name, help, labelnames, buckets):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: dict(value, counts=list(value["counts"])) for key, value in self._series.items()}
+        for key, value in sorted(series.items()):
+            labels = [f'{name}="{_escape(label)}"' for name, label in zip(self.labelnames, key)]
+            cumulative = 0
+            for bound, count in zip(self.buckets, value["counts"]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{{{','.join(labels + [_le(bound)])}}} {cumulative}")
+            lines.append(f"{self.name}_bucket{{{','.join(labels + [_le('+Inf')])}}} {value['count']}")
+            suffix = f"{{{','.join(labels)}}}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {value['sum']}")
+            lines.append(f"{self.name}_count{suffix} {value['count']}")
+        return "\n".join(lines)
+
+
+class Counter:
+    """A Prometheus counter with a fixed set of label names."""
+
+    def __init__(self, name, help, labelnames):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            labels = ",".join(f'{name}="{_escape(label)}"' for name, label in zip(self.labelnames, key))
+            lines.append(f"{self.name}{{{labels}}} {value}")
+        return "\n".join(lines)
+
+
+def _le(bound):
+    return f'le="{bound}"'
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+span_seconds = Histogram(
+    "uriel_span_seconds", "Duration of instrumented stages of a research run.", ("span", "detail"), SPAN_BUCKETS
+)
+span_errors = Counter("uriel_span_errors_total", "Instrumented stages that raised an exception.", ("span", "detail"))
+llm_tokens_per_second = Histogram(
+    "uriel_llm_tokens_per_second", "Generation speed of each LLM call.", ("model",), TOKEN_RATE_BUCKETS
+)
+llm_tokens = Counter("uriel_llm_generated_tokens_total", "Tokens generated by LLM calls.", ("model",))
+context_tokens = Counter(
+    "uriel_context_tokens_total", "Approximate tokens of task context before and after compaction.", ("task", "stage")
+)
+
+REGISTRY = (span_seconds, span_errors, llm_tokens_per_second, llm_tokens, context_tokens)
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format."""
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+def record_span(name, seconds, detail="", error=None, started_at=None, **attrs):
+    """Records a finished span in the histograms and in every trace collecting this context."""
+    span_seconds.observe(seconds, span=name, detail=detail)
+    if error is not None:
+        span_errors.inc(span=name, detail=detail)
+
+    traces = _traces.get()
+    if traces:
+        entry = {
+            "name": name,
+            "detail": detail,
+            "startedAt": started_at if started_at is not None else time.time() - seconds,
+            "seconds": seconds,
+            "thread": threading.current_thread().name,
+            "attrs": attrs,
+        }
+        if error is not None:
+            entry["error"] = error
+        for trace in traces:
+            trace.add(entry)
+
+
+@contextmanager
+def span(name, detail="", **attrs):
+    """Times the block as a span; the yielded dict takes extra attributes for the trace."""
+    started_at, started = time.time(), time.perf_counter()
+    error = None
+    try:
+        yield attrs
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record_span(name, time.perf_counter() - started, detail, error=error, started_at=started_at, **attrs)
+
+
+def observe_llm_call(model, tokens, generation_seconds):
+    """Records the tokens of one LLM call and its speed once generation started."""
+    llm_tokens.inc(tokens, model=model)
+    if tokens and generation_seconds > 0:
+        llm_tokens_per_second.observe(tokens / generation_seconds, model=model)
+
+
+class Trace:
+    """The spans finished during one research run."""
+
+    def __init__(self, **attrs):
+        self.attrs = attrs
+        self.started_at = time.time()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, entry):
+        with self._lock:
+            self.spans.append(entry)
+
+    def to_dict(self):
+        with self._lock:
+            spans = sorted(self.spans, key=lambda entry: entry["startedAt"])
+        return {
+            **self.attrs,
+            "startedAt": self.started_at,
+            "seconds": time.time() - self.started_at,
+            "spans": [dict(entry, startedAt=entry["startedAt"] - self.started_at) for entry in spans],
+        }
+
+    def dump(self, output_file):
+        """Writes the trace next to a research output: summary.md -> summary.trace.json."""
+        path = os.path.splitext(output_file)[0] + ".trace.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+
+@contextmanager
+def collect_trace(**attrs):
+    """Collects the spans finished inside the block.
+
+    Spans on other threads are included when those threads run in a copy of
+    this context, as web_search's page fetches do.
+    """
+    trace = Trace(**attrs)
+    token = _traces.set(_traces.get() + (trace,))
+    try:
+        yield trace
+    finally:
+        _traces.reset(token)
+
+
+def replay_spans(spans):
+    """Adds spans collected in another process (a crew pool worker) to this process's metrics."""
+    for entry in spans:
+        span_seconds.observe(entry["seconds"], span=entry["name"], detail=entry["detail"])
+        if "error" in entry:
+            span_errors.inc(span=entry["name"], detail=entry["detail"])
+        if entry["name"] == "llm" and "generationSeconds" in entry["attrs"]:
+            observe_llm_call(entry["detail"], entry["attrs"]["tokens"], entry["attrs"]["generationSeconds"])
+        if entry["name"] == "compact" and "tokensBefore" in entry["attrs"]:
+            context_tokens.inc(entry["attrs"]["tokensBefore"], task=entry["detail"], stage="raw")
+            context_tokens.inc(entry["attrs"]["tokensAfter"], task=entry["detail"], stage="compacted")
@@ -0,0 +1,156 @@
+# model_routing.py
+
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, replace
+
+import requests
+
+from config import OLLAMA_BASE_URL
+from logger_config import logger, setup_logging
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """The Ollama model an agent role runs on.
+
+    ``num_ctx`` is the context window in tokens, or None for the model's
+    default. How long a model stays loaded is not set per route: every
+    OpenAI-compatible chat request resets it to the server's default, so set
+    OLLAMA_KEEP_ALIVE (e.g. "30m", or -1 for indefinitely) on the Ollama server.
+    """
+    model: str
+    num_ctx: int = None
+
+    @property
+    def served_model(self):
+        """Name the OpenAI-compatible endpoint is called with.
+
+        That endpoint cannot pass options, so a custom context window is baked
+        into a derived model created by ``prepare_models``.
+        """
+        return f"{self.model}-ctx{self.num_ctx}" if self.num_ctx else self.model
+
+
+# Model routing settings: agent role -> model. Override any part with
+# URIEL_MODEL_ROUTES, e.g. '{"summarizer": {"model": "deepseek-r1:32b", "num_ctx": 16384}}'
+DEFAULT_ROUTES = {
+    "researcher": ModelRoute("deepseek-r1:1.5b"),
+    "analyst": ModelRoute("deepseek-r1:1.5b"),
+    "summarizer": ModelRoute("deepseek-r1:1.5b"),
+    "notes": ModelRoute("deepseek-r1:1.5b"),  # fanout.py: sub-query planning and per-source notes
+    "writer": ModelRoute("deepseek-r1:32b"),  # Simpletest.py's content crew
+}
+CREW_ROLES = ("researcher", "notes", "analyst", "summarizer")
+WARMUP_TIMEOUT = 300        # Seconds allowed for Ollama to load one model
+WARM_ON_STARTUP = os.environ.get("URIEL_WARM_MODELS", "1") != "0"  # Set URIEL_WARM_MODELS=0 to skip preloading
+
+
+def _load_routes():
+    routes = dict(DEFAULT_ROUTES)
+    overrides = json.loads(os.environ.get("URIEL_MODEL_ROUTES", "{}"))
+    for role, override in overrides.items():
+        if isinstance(override, str):
+            override = {"model": override}
+        if "keep_alive" in override:
+            override = {key: value for key, value in override.items() if key != "keep_alive"}
+            logger.warning(f"⚠️ Ignoring keep_alive of the {role} route, set OLLAMA_KEEP_ALIVE on the Ollama server")
+        base = routes.get(role, ModelRoute(override.get("model", DEFAULT_ROUTES["researcher"].model)))
+        routes[role] = replace(base, **override)
+    return routes
+
+
+MODEL_ROUTES = _load_routes()
+
+
+def route_for(role):
+    """Returns the route of an agent role; unknown roles use the researcher's."""
+    return MODEL_ROUTES.get(role, MODEL_ROUTES["researcher"])
+
+
+def describe_routes(roles=CREW_ROLES):
+    """Compact role=model listing used to key cached runs and in logs."""
+    return ",".join(f"{role}={route_for(role).served_model}" for role in roles)
+
+
+def ollama_native_url(base_url=OLLAMA_BASE_URL):
+    """Turns the OpenAI-compatible base URL (…/v1) into Ollama's native API root."""
+    base_url = base_url.rstrip("/")
+    return base_url[:-3] if base_url.endswith("/v1") else base_url
+
+
+def _ensure_served_model(route, api, session):
+    if not route.num_ctx:
+        return
+    if session.post(f"{api}/api/show", json={"model": route.served_model}, timeout=30).ok:
+        return
+    logger.info(f"🧩 Creating {route.served_model} from {route.model} with num_ctx={route.num_ctx}")
+    response = session.post(
+        f"{api}/api/create",
+        json={"model": route.served_model, "from": route.model, "parameters": {"num_ctx": route.num_ctx},
+              "stream": False},
+        timeout=WARMUP_TIMEOUT,
+    )
+    response.raise_for_status()
+
+
+def _warm(route, api, session):
+    # A generate request without a prompt only loads the model, for the server's OLLAMA_KEEP_ALIVE
+    response = session.post(
+        f"{api}/api/generate",
+        json={"model": route.served_model, "stream": False},
+        timeout=WARMUP_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json().get("load_duration", 0) / 1e9
+
+
+def prepare_models(routes=None, base_url=OLLAMA_BASE_URL, warm=True):
+    """Creates any derived context-size models and preloads the routed models.
+
+    ``routes`` defaults to the research crew's. Each distinct model is
+    prepared once; failures are logged, not raised, so a missing Ollama server
+    does not stop the app from starting. Returns ``{served_model: seconds
+    spent loading, or None on failure}``.
+    """
+    routes = routes if routes is not None else {role: route_for(role) for role in CREW_ROLES}
+    unique = {route.served_model: route for route in routes.values()}
+    api = ollama_native_url(base_url)
+    loaded = {}
+    with requests.Session() as session:
+        for name, route in unique.items():
+            try:
+                _ensure_served_model(route, api, session)
+                loaded[name] = _warm(route, api, session) if warm else 0.0
+                if warm:
+                    logger.info(f"🔥 Warmed {name} (load {loaded[name]:.1f}s)")
+            except (requests.RequestException, ValueError) as e:
+                logger.warning(f"⚠️ Could not prepare model {name} at {api}: {e}")
+                loaded[name] = None
+    return loaded
+
+
+def prepare_models_in_background(routes=None, base_url=OLLAMA_BASE_URL):
+    """Creates derived models now, then loads every model on a daemon thread.
+
+    Derived models must exist before the first chat request uses their names;
+    loading can happen while the caller carries on.
+    """
+    prepare_models(routes, base_url, warm=False)
+    thread = threading.Thread(target=prepare_models, args=(routes, base_url), name="model-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Show the agent model routes and preload them into Ollama.")
+    parser.add_argument("--base-url", default=OLLAMA_BASE_URL, help="OpenAI-compatible Ollama URL (…/v1)")
+    parser.add_argument("--no-warm", action="store_true", help="Only create derived models, do not load them")
+    args = parser.parse_args()
+
+    setup_logging()
+    print(json.dumps({role: asdict(route) for role, route in MODEL_ROUTES.items()}, indent=2))
+    print(json.dumps(prepare_models(base_url=args.base_url, warm=not args.no_warm), indent=2))
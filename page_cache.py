@@ -0,0 +1,170 @@
+# page_cache.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+# Page cache settings
+PAGE_CACHE_PATH = os.path.join("cache", "pages.sqlite3")
+PAGE_CACHE_TTL = 6 * 60 * 60               # Seconds a page is served without revalidation
+PAGE_CACHE_MAX_BYTES = 256 * 1024 * 1024   # Extracted text kept before LRU eviction
+
+
+@dataclass
+class CachedPage:
+    """Extracted text for a URL plus the validators needed to revalidate it."""
+
+    url: str
+    text: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+    ttl: float
+
+    @property
+    def fresh(self):
+        return time.time() - self.fetched_at < self.ttl
+
+    def conditional_headers(self):
+        """Headers for a conditional GET against the origin."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """SQLite-backed, content-addressed store of extracted page text.
+
+    Texts are stored once per SHA-256 digest and referenced by URL, so mirrored
+    pages share storage. Entries are evicted least-recently-used first once the
+    stored text exceeds ``max_bytes``.
+    """
+
+    def __init__(self, path=PAGE_CACHE_PATH, ttl=PAGE_CACHE_TTL, max_bytes=PAGE_CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stale": 0, "revalidated": 0, "stores": 0, "evictions": 0}
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at);
+            """
+        )
+        self._db.commit()
+
+    def lookup(self, url):
+        """Returns the cached page for a URL, fresh or stale, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT b.text, p.etag, p.last_modified, p.fetched_at FROM pages p "
+                "JOIN blobs b ON b.digest = p.digest WHERE p.url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+
+            page = CachedPage(url, row[0], row[1], row[2], row[3], self.ttl)
+            self._stats["hits" if page.fresh else "stale"] += 1
+            self._db.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+            return page
+
+    def mark_revalidated(self, url):
+        """Restarts the TTL of a page the origin answered with 304 Not Modified."""
+        with self._lock:
+            now = time.time()
+            self._db.execute("UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+            self._db.commit()
+            self._stats["revalidated"] += 1
+
+    def store(self, url, text, etag=None, last_modified=None):
+        """Stores the extracted text of a URL along with its HTTP validators."""
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR IGNORE INTO blobs (digest, text, size) VALUES (?, ?, ?)",
+                (digest, text, len(data)),
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (url, digest, etag, last_modified, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, digest, etag, last_modified, now, now),
+            )
+            self._stats["stores"] += 1
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """Drops least-recently-used pages until the stored text fits in max_bytes."""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        while total > self.max_bytes:
+            victim = self._db.execute("SELECT url, digest FROM pages ORDER BY accessed_at LIMIT 1").fetchone()
+            if victim is None:
+                break
+            self._db.execute("DELETE FROM pages WHERE url = ?", (victim[0],))
+            self._db.execute(
+                "DELETE FROM blobs WHERE digest = ? AND NOT EXISTS (SELECT 1 FROM pages WHERE digest = ?)",
+                (victim[1], victim[1]),
+            )
+            self._stats["evictions"] += 1
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM pages")
+            self._db.execute("DELETE FROM blobs")
+            self._db.commit()
+
+    def stats(self):
+        """Returns hit/miss counters plus the current size of the cache."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"], stats["bytes"] = self._db.execute(
+                "SELECT COUNT(*), (SELECT COALESCE(SUM(size), 0) FROM blobs) FROM pages"
+            ).fetchone()
+        lookups = stats["hits"] + stats["misses"] + stats["stale"]
+        stats["hit_rate"] = (stats["hits"] + stats["revalidated"]) / lookups if lookups else 0.0
+        return stats
+
+
+_page_cache = None
+_page_cache_lock = threading.Lock()
+
+
+def get_page_cache():
+    """Returns the process-wide page cache, opening it on first use."""
+    global _page_cache
+    if _page_cache is None:
+        with _page_cache_lock:
+            if _page_cache is None:
+                _page_cache = PageCache()
+    return _page_cache
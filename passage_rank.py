@@ -0,0 +1,83 @@
+# passage_rank.py
+
+import re
+
+import numpy as np
+
+# Passage ranking settings
+PASSAGE_WORDS = 120        # Words per passage
+PASSAGE_OVERLAP = 20       # Words shared by consecutive passages of a page
+CHARS_PER_TOKEN = 4        # Rough size of a token for budget estimates
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+
+def estimate_tokens(text):
+    """Approximates the LLM token count of a text from its length."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def split_passages(text, words=PASSAGE_WORDS, overlap=PASSAGE_OVERLAP):
+    """Splits text into overlapping windows of about ``words`` words."""
+    tokens = text.split()
+    if len(tokens) <= words:
+        return [text.strip()] if tokens else []
+    step = max(1, words - overlap)
+    return [" ".join(tokens[start:start + words]) for start in range(0, len(tokens) - overlap, step)]
+
+
+def bm25_scores(query, passages, k1=BM25_K1, b=BM25_B):
+    """Scores every passage against the query with Okapi BM25 in one vectorized pass."""
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms or not passages:
+        return np.zeros(len(passages))
+
+    term_index = {term: i for i, term in enumerate(terms)}
+    tokenized = [tokenize(passage) for passage in passages]
+    lengths = np.array([len(tokens) for tokens in tokenized], dtype=np.float64)
+
+    # Term-frequency matrix restricted to the query terms: passages x terms
+    rows, cols = [], []
+    for row, tokens in enumerate(tokenized):
+        for token in tokens:
+            col = term_index.get(token)
+            if col is not None:
+                rows.append(row)
+                cols.append(col)
+    tf = np.zeros((len(passages), len(terms)))
+    np.add.at(tf, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)), 1)
+
+    n = len(passages)
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log((n - df + 0.5) / (df + 0.5) + 1.0)
+    norm = k1 * (1 - b + b * lengths / max(lengths.mean(), 1.0))
+    return (idf * tf * (k1 + 1) / (tf + norm[:, None])).sum(axis=1)
+
+
+def select_passages(query, documents, token_budget):
+    """Returns the best-scoring passages of the documents that fit in ``token_budget``.
+
+    ``documents`` are ``{"url", "text"}`` dicts as returned by search_and_extract.
+    The result is a list of ``{"url", "text", "score"}`` dicts, best first.
+    """
+    passages, urls = [], []
+    for document in documents:
+        for passage in split_passages(document["text"]):
+            passages.append(passage)
+            urls.append(document["url"])
+
+    scores = bm25_scores(query, passages)
+    selected, used = [], 0
+    for i in np.argsort(-scores, kind="stable"):
+        cost = estimate_tokens(passages[i])
+        if used + cost > token_budget:
+            continue
+        selected.append({"url": urls[i], "text": passages[i], "score": float(scores[i])})
+        used += cost
+    return selected
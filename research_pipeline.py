@@ -1,47 +1,172 @@
 import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
 from datetime import datetime
-from crewai import Crew
-from tasks import research, analyze, summarize
-from agents import researcher, analyst, summarizer
-from logger_config import logger
-
-# Initialize Crew with agents and tasks
-crew = Crew(
-    agents=[researcher, analyst, summarizer],
-    tasks=[research, analyze, summarize],
-    verbose=2
-)
-
-def run_research(topic):
+from model_routing import WARM_ON_STARTUP, describe_routes, prepare_models_in_background
+from crew_factory import build_crew, crew_slot
+from doc_index import bypass_local_index
+from llm_cache import bypass_llm_cache
+from logger_config import logger, setup_logging
+from metrics import TRACE_DUMPS, collect_trace
+from run_cache import crew_fingerprint, get_run_cache, unique_output_file
+from run_store import RunStore, use_run_store
+from web_search import search_local_first
+
+# Batch settings
+BATCH_LLM_CONCURRENCY = int(os.environ.get("URIEL_BATCH_LLM_CONCURRENCY", "2"))  # Crews talking to Ollama at once
+BATCH_PREFETCH_WORKERS = 8   # Topics whose pre-flight search runs at the same time
+BATCH_MAX_TOPICS = 50        # Larger batches are refused by the API
+
+DEFAULT_TOPIC = "Latest developments in quantum computing and its practical applications"
+
+
+def _research_topic(topic, refresh=False):
+    """Runs the crew on a topic, or serves a saved summary; returns (result, output_file, cached)."""
     inputs = {"topic": topic}
 
-    try:
-        logger.info(f"Starting research compilation for topic: {topic}")
-        logger.info("Initializing crew and starting tasks")
+    # Serve a recent summary of the same topic from the same crew and model
+    fingerprint = crew_fingerprint()
+    if not refresh:
+        cached = get_run_cache().get(topic, fingerprint)
+        if cached is not None:
+            result, output_file = cached
+            logger.info(f"Returning saved research summary: {output_file}")
+            return result, output_file, True
+
+    logger.info(f"Starting research compilation for topic: {topic}")
+    logger.info("Initializing crew and starting tasks")
 
-        result = crew.kickoff(inputs=inputs)
+    with crew_slot():
+        crew = build_crew()
+        with bypass_llm_cache() if refresh else nullcontext(), bypass_local_index() if refresh else nullcontext(), \
+                collect_trace(topic=topic) as trace:
+            result = crew.kickoff(inputs=inputs)
 
-        # Create output directory
-        os.makedirs('research_outputs', exist_ok=True)
-        logger.info("Created research_outputs directory")
+    # Create output directory
+    os.makedirs('research_outputs', exist_ok=True)
 
-        # Generate timestamp for unique filename
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_file = f'research_outputs/research_summary_{timestamp}.md'
+    # Reserve a unique filename; runs of a batch can finish within the same second
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    output_file = unique_output_file(timestamp)
 
-        # Save result to file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(result)
-        logger.info(f"Research summary saved to file: {output_file}")
+    # Save result to file
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(result)
+    logger.info(f"Research summary saved to file: {output_file}")
+    get_run_cache().put(topic, fingerprint, output_file, model=describe_routes())
+    if TRACE_DUMPS:
+        logger.info(f"Run trace saved to file: {trace.dump(output_file)}")
+    return result, output_file, False
 
-        logger.info("Research process completed successfully")
+
+def run_research(topic, refresh=False):
+    try:
+        # Later agents' models load while the researcher works
+        if WARM_ON_STARTUP:
+            prepare_models_in_background()
+        result, _, cached = _research_topic(topic, refresh)
+        if not cached:
+            logger.info("Research process completed successfully")
         print(result)
+        return result
 
     except Exception as e:
         logger.error(f"An error occurred: {str(e)}", exc_info=True)
         logger.error("Research process failed")
         raise
 
+
+def run_batch(topics, refresh=False, llm_concurrency=BATCH_LLM_CONCURRENCY):
+    """Researches several topics and yields each topic's result as soon as it is finished.
+
+    At most ``llm_concurrency`` crews run at once, and each also takes one of
+    the process-wide crew slots shared with queued jobs, so Ollama is not handed
+    more parallel generations than it can serve. Meanwhile the pre-flight
+    searches of the waiting topics run ahead on BATCH_PREFETCH_WORKERS threads.
+
+    All topics share one RunStore: a query or URL gathered for one topic is
+    served from it to the others, and URLs that two topics fetch at the same
+    time are downloaded once. Results are dicts with ``topic``, ``status`` and
+    either ``rawOutput``, ``outputFile`` and ``cached`` or ``error``; a failing
+    topic does not stop the batch.
+    """
+    topics = list(dict.fromkeys(topics))
+    store = RunStore()
+    if WARM_ON_STARTUP:
+        prepare_models_in_background()
+
+    def prefetch(topic):
+        with use_run_store(store), bypass_local_index() if refresh else nullcontext():
+            return search_local_first(topic, num_results=5)[0]  # Same path and width as WebSearchTool
+
+    def research(topic, prefetched):
+        started = time.perf_counter()
+        try:
+            if prefetched is not None and not prefetched.result():
+                logger.warning(f"⚠️ Pre-flight search found nothing for '{topic}', the researcher searches on its own")
+        except Exception as e:
+            logger.warning(f"⚠️ Pre-flight search failed for '{topic}': {e}")
+        try:
+            with use_run_store(store):
+                result, output_file, cached = _research_topic(topic, refresh)
+            outcome = {"status": "success", "rawOutput": result, "outputFile": output_file, "cached": cached}
+        except Exception as e:
+            logger.error(f"❌ Batch topic '{topic}' failed: {e}", exc_info=True)
+            outcome = {"status": "error", "error": str(e)}
+        return {"topic": topic, **outcome, "seconds": round(time.perf_counter() - started, 3)}
+
+    fingerprint = crew_fingerprint()
+    logger.info(f"📚 Starting batch of {len(topics)} topic(s), {llm_concurrency} crew(s) at a time")
+    with ThreadPoolExecutor(max_workers=BATCH_PREFETCH_WORKERS, thread_name_prefix="batch-prefetch") as prefetcher, \
+            ThreadPoolExecutor(max_workers=max(1, llm_concurrency), thread_name_prefix="batch-crew") as crews:
+        futures, prefetches = [], []
+        for topic in topics:
+            # Topics with a saved summary need no pre-flight search
+            saved = not refresh and get_run_cache().get(topic, fingerprint) is not None
+            prefetched = None if saved else prefetcher.submit(prefetch, topic)
+            prefetches.append(prefetched)
+            futures.append(crews.submit(research, topic, prefetched))
+
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # The consumer went away (e.g. a closed HTTP stream): drop the topics not started yet
+            for future in futures + prefetches:
+                if future is not None:
+                    future.cancel()
+
+    logger.info(f"📦 Batch store reuse: {store.stats}")
+
+
+def _read_topics(path):
+    """Reads one topic per line from a file, or from stdin for "-"; blank lines and # comments are skipped."""
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
 if __name__ == "__main__":
-    topic = "Latest developments in quantum computing and its practical applications"
-    run_research(topic)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the Uriel research crew on one or more topics.")
+    parser.add_argument("topics", nargs="*", metavar="topic", help=f"Default: {DEFAULT_TOPIC}")
+    parser.add_argument("--batch", metavar="FILE", help="Also research the topics in FILE, one per line (- for stdin)")
+    parser.add_argument("--concurrency", type=int, default=BATCH_LLM_CONCURRENCY,
+                        help="Crews running against Ollama at once in a batch")
+    parser.add_argument("--refresh", action="store_true", help="Ignore saved summaries and cached LLM responses")
+    args = parser.parse_args()
+
+    setup_logging()
+    topics = args.topics + (_read_topics(args.batch) if args.batch else []) or [DEFAULT_TOPIC]
+    if len(topics) == 1:
+        run_research(topics[0], refresh=args.refresh)
+    else:
+        # One JSON line per topic, printed as each finishes
+        for outcome in run_batch(topics, refresh=args.refresh, llm_concurrency=args.concurrency):
+            print(json.dumps(outcome, ensure_ascii=False), flush=True)
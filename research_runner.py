@@ -0,0 +1,148 @@
+# research_runner.py
+
+import os
+import contextvars
+from contextlib import nullcontext
+from datetime import datetime
+from logger_config import logger
+from web_search import search_local_first
+from domain_health import get_domain_health
+from run_store import RunStore, use_run_store
+from llm_cache import bypass_llm_cache, get_response_store
+from doc_index import bypass_local_index
+from page_cache import get_page_cache
+from run_cache import crew_fingerprint, get_run_cache, unique_output_file
+from token_stream import stream_tokens_to
+from metrics import TRACE_DUMPS, collect_trace, span
+from model_routing import describe_routes
+from crew_factory import build_crew, crew_slot, get_crew_pool
+
+# The API's research runs. Crew pool workers unpickle build_run_crew and
+# run_research from here, so importing this module must not start anything.
+
+# Progress callback of the research run executing on the current thread
+_progress = contextvars.ContextVar("progress", default=None)
+
+
+def _report(event, **data):
+    progress = _progress.get()
+    if progress is not None:
+        progress(event, **data)
+
+
+# Stage that starts once the named task has finished
+_NEXT_STAGE = {"research": "analyze", "analyze": "summarize"}
+
+
+def _on_task_done(task_name, output):
+    """Reports the next stage together with the output of the task that just finished."""
+    if task_name in _NEXT_STAGE:
+        _report("stage", stage=_NEXT_STAGE[task_name], partial=getattr(output, "raw_output", str(output)))
+
+
+def build_run_crew(http_client=None):
+    """Builds an isolated crew whose task transitions are reported to the current run."""
+    return build_crew(on_task_done=_on_task_done, http_client=http_client)
+
+
+def run_research(topic, progress=None, crew=None, refresh=False):
+    """Runs the research process and returns results.
+
+    ``progress(event, **data)``, when given, receives stage transitions and the
+    output of each finished task while the crew runs. A fresh crew is built
+    for the run unless one is passed in.
+
+    Searches and pages fetched during the run, including the pre-flight search,
+    are kept in a RunStore that the researcher's WebSearchTool reuses.
+
+    A summary saved within RUN_CACHE_TTL for the same topic, crew definition
+    and model is returned without running the crew. ``refresh`` forces a new
+    run and also bypasses the LLM response cache.
+
+    With TRACE_DUMPS the timing spans of the run are saved as a .trace.json
+    file next to the summary.
+    """
+    token = _progress.set(progress)
+    try:
+        fingerprint = crew_fingerprint()
+        if not refresh:
+            cached = get_run_cache().get(topic, fingerprint)
+            if cached is not None:
+                result_text, output_file = cached
+                logger.info(f"♻️ Returning saved research summary for '{topic}': {output_file}")
+                _report("stage", stage="cached")
+                return {"status": "success", "rawOutput": result_text, "outputFile": output_file, "cached": True}
+
+        with use_run_store(RunStore()) as store, (bypass_llm_cache() if refresh else nullcontext()), \
+                (bypass_local_index() if refresh else nullcontext()), stream_tokens_to(lambda text: _report("token", text=text)), collect_trace(topic=topic) as trace:
+            with span("run"):
+                result = _run_research(topic, crew or build_run_crew())
+        logger.info(f"📦 Run store reuse for '{topic}': {store.stats}")
+        logger.info(f"🗄️ Page cache: {get_page_cache().stats()}")
+        logger.info(f"🧠 LLM response cache: {get_response_store().stats()}")
+        logger.info(f"🩺 Domain health: {get_domain_health().stats()}")
+
+        if result.get("status") == "success":
+            get_run_cache().put(topic, fingerprint, result["outputFile"], model=describe_routes())
+            if TRACE_DUMPS:
+                result["traceFile"] = trace.dump(result["outputFile"])
+                logger.info(f"🧵 Run trace saved: {result['traceFile']}")
+        return result
+    finally:
+        _progress.reset(token)
+
+
+def execute_research(topic, progress=None, refresh=False):
+    """Runs a topic on the crew worker pool when one is configured, else on this thread.
+
+    The run holds a crew slot, shared with batch topics, for its whole duration.
+    """
+    with crew_slot():
+        pool = get_crew_pool(build_run_crew, run_research)
+        if pool is not None:
+            return pool.run(topic, progress, refresh=refresh)
+        return run_research(topic, progress, refresh=refresh)
+
+
+def _run_research(topic, crew):
+    inputs = {"topic": topic}
+    _report("stage", stage="search")
+
+    # Pre-flight search; its results stay in the run store for the researcher's tool calls
+    logger.info(f"🧪 Testing WebSearchTool separately for topic: {topic}")
+
+    test_results, _ = search_local_first(topic, num_results=5)  # Same path and width as WebSearchTool
+    if not test_results:
+        logger.error("❌ Search tool returned no results!")
+        return {"status": "error", "error": "Search tool did not return any results"}
+
+    logger.info(f"✅ Search tool test successful: {len(test_results)} sources")
+    logger.debug(f"✅ Search Tool Results:\n{test_results}")
+
+    try:
+        logger.info(f"🚀 Starting CrewAI research for: {topic}")
+        _report("stage", stage="research")
+
+        result = crew.kickoff(inputs=inputs)
+
+        os.makedirs('research_outputs', exist_ok=True)  # Ensure output directory exists
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output_file = unique_output_file(timestamp)
+
+        # Extract only the "Final Answer" if the result is structured
+        if isinstance(result, dict) and "Final Answer" in result:
+            result_text = result["Final Answer"]
+        else:
+            result_text = str(result)
+
+        # Save research summary to a file
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(result_text)
+
+        logger.info(f"✅ Research summary saved: {output_file}")
+
+        return {"status": "success", "rawOutput": result_text, "outputFile": output_file}
+
+    except Exception as e:
+        logger.error(f"❌ Error during execution: {e}", exc_info=True)
+        return {"status": "error", "error": str(e)}
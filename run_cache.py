@@ -0,0 +1,106 @@
+# run_cache.py
+
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from search_cache import normalize_query
+
+# Run cache settings
+RUN_CACHE_INDEX = os.path.join("research_outputs", "index.sqlite3")
+RUN_CACHE_TTL = 24 * 60 * 60   # Seconds a saved summary is returned instead of re-running the crew
+
+
+@functools.lru_cache(maxsize=1)
+def crew_fingerprint():
+    """Hashes the routed models and the agent and task definitions of the research crew.
+
+    Editing a role, goal, backstory, task description or a model route, or
+    switching fan-out or compaction on or off, changes the fingerprint, so
+    summaries produced by an older crew are no longer served.
+    """
+    from agents import researcher, analyst, summarizer
+    from model_routing import describe_routes
+    from tasks import research, analyze, summarize
+
+    definition = {
+        "model": describe_routes(),
+        "agents": [[agent.role, agent.goal, agent.backstory] for agent in (researcher, analyst, summarizer)],
+        "tasks": [[type(task).__name__, task.description, task.expected_output] for task in (research, analyze, summarize)],
+    }
+    return hashlib.sha256(json.dumps(definition, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def unique_output_file(timestamp):
+    """Reserves research_outputs/research_summary_<timestamp>.md without clobbering a parallel run."""
+    output_file = f'research_outputs/research_summary_{timestamp}.md'
+    suffix = 1
+    while True:
+        try:
+            open(output_file, 'x', encoding='utf-8').close()
+            return output_file
+        except FileExistsError:
+            output_file = f'research_outputs/research_summary_{timestamp}_{suffix}.md'
+            suffix += 1
+
+
+class RunCache:
+    """Index of saved research summaries keyed on normalized topic and crew fingerprint."""
+
+    def __init__(self, path=RUN_CACHE_INDEX, ttl=RUN_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "topic_key TEXT NOT NULL, fingerprint TEXT NOT NULL, topic TEXT NOT NULL, model TEXT, "
+            "output_file TEXT NOT NULL, created_at REAL NOT NULL, PRIMARY KEY (topic_key, fingerprint))"
+        )
+        self._db.commit()
+
+    def get(self, topic, fingerprint):
+        """Returns (summary_text, output_file) of a fresh saved run, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT output_file, created_at FROM runs WHERE topic_key = ? AND fingerprint = ?",
+                (normalize_query(topic), fingerprint),
+            ).fetchone()
+        if row is None or time.time() - row[1] >= self.ttl:
+            return None
+
+        try:
+            with open(row[0], encoding="utf-8") as f:
+                return f.read(), row[0]
+        except OSError:
+            return None  # The summary file was moved or deleted
+
+    def put(self, topic, fingerprint, output_file, model=None):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO runs (topic_key, fingerprint, topic, model, output_file, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (normalize_query(topic), fingerprint, topic, model, output_file, time.time()),
+            )
+            self._db.commit()
+
+
+_run_cache = None
+_run_cache_lock = threading.Lock()
+
+
+def get_run_cache():
+    """Returns the process-wide run cache, opening it on first use."""
+    global _run_cache
+    if _run_cache is None:
+        with _run_cache_lock:
+            if _run_cache is None:
+                _run_cache = RunCache()
+    return _run_cache
@@ -0,0 +1,77 @@
+# run_store.py
+
+import contextvars
+import threading
+from contextlib import contextmanager
+
+from search_cache import normalize_query
+
+_current_store = contextvars.ContextVar("run_store", default=None)
+
+
+class RunStore:
+    """Search results and page texts gathered during one research run.
+
+    ``search_and_extract`` answers repeated queries and already-extracted URLs
+    from the active store, so the pre-flight search and the researcher's tool
+    calls within the same run never fetch a page twice.
+    """
+
+    def __init__(self):
+        self._searches = {}
+        self._pages = {}
+        self._lock = threading.Lock()
+        self.stats = {"search_hits": 0, "search_misses": 0, "page_hits": 0, "page_misses": 0}
+
+    def get_search(self, query, num_results):
+        """Returns up to num_results URLs already found for the query, or None."""
+        with self._lock:
+            entry = self._searches.get(normalize_query(query))
+            if entry is None or entry[1] < num_results:
+                self.stats["search_misses"] += 1
+                return None
+            self.stats["search_hits"] += 1
+            return entry[0][:num_results]
+
+    def put_search(self, query, num_results, urls):
+        key = normalize_query(query)
+        with self._lock:
+            # Keep the widest search seen for the query so narrower ones can be sliced from it
+            if key not in self._searches or self._searches[key][1] < num_results:
+                self._searches[key] = (list(urls), num_results)
+
+    def get_pages(self, urls):
+        """Returns {url: text} for the URLs whose text is already in the store."""
+        with self._lock:
+            found = {url: self._pages[url] for url in urls if url in self._pages}
+            self.stats["page_hits"] += len(found)
+            self.stats["page_misses"] += len(set(urls) - set(found))
+            return found
+
+    def get_page(self, url):
+        """Re-checks a URL that missed in get_pages right before it is fetched; a hit turns that miss into a hit."""
+        with self._lock:
+            text = self._pages.get(url)
+            if text is not None:
+                self.stats["page_hits"] += 1
+                self.stats["page_misses"] -= 1
+            return text
+
+    def put_pages(self, texts):
+        with self._lock:
+            self._pages.update(texts)
+
+
+def current_run_store():
+    """Returns the store of the run executing in this context, if any."""
+    return _current_store.get()
+
+
+@contextmanager
+def use_run_store(store):
+    """Makes ``store`` the active run store for the duration of the block."""
+    token = _current_store.set(store)
+    try:
+        yield store
+    finally:
+        _current_store.reset(token)
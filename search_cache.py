@@ -0,0 +1,136 @@
+# search_cache.py
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+# Search cache settings
+SEARCH_CACHE_PATH = os.path.join("cache", "searches.sqlite3")
+SEARCH_CACHE_TTL = 60 * 60        # Seconds a result list is reused for the same query
+SEARCH_CACHE_MAX_MEMORY = 512     # Result lists kept in memory before the oldest is dropped
+
+# Punctuation, except + and # ending a word (C++, C#) and dots inside or leading a word (node.js, .NET)
+_PUNCTUATION = re.compile(r"(?P<keep>(?<=\w)[+#]+|(?:(?<=\w)|(?<!\S))\.(?=\w))|[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query):
+    """Folds case, punctuation and whitespace so near-identical queries share a key.
+
+    Punctuation that is part of a name is kept, so "C++", "C#" and "C" stay apart.
+    """
+    query = _PUNCTUATION.sub(lambda m: m.group("keep") or " ", query.casefold())
+    return _WHITESPACE.sub(" ", query).strip()
+
+
+class SearchCache:
+    """Result-URL lists keyed on normalized query and result count.
+
+    Lookups are answered from memory first and fall back to a SQLite table so
+    results survive restarts and are shared by the pipeline scripts.
+    """
+
+    def __init__(self, path=SEARCH_CACHE_PATH, ttl=SEARCH_CACHE_TTL, max_memory=SEARCH_CACHE_MAX_MEMORY):
+        self.ttl = ttl
+        self.max_memory = max_memory
+        self._memory = {}
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS searches ("
+            "query TEXT NOT NULL, num_results INTEGER NOT NULL, urls TEXT NOT NULL, stored_at REAL NOT NULL, "
+            "PRIMARY KEY (query, num_results))"
+        )
+        self._db.commit()
+
+    def get(self, key):
+        """Returns the cached URL list for a (normalized query, num_results) key, or None."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[1] < self.ttl:
+                self._stats["memory_hits"] += 1
+                return list(entry[0])
+
+            row = self._db.execute(
+                "SELECT urls, stored_at FROM searches WHERE query = ? AND num_results = ?", key
+            ).fetchone()
+            if row is not None and now - row[1] < self.ttl:
+                urls = json.loads(row[0])
+                self._remember(key, urls, row[1])
+                self._stats["disk_hits"] += 1
+                return list(urls)
+
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key, urls):
+        now = time.time()
+        with self._lock:
+            self._remember(key, list(urls), now)
+            self._db.execute(
+                "INSERT OR REPLACE INTO searches (query, num_results, urls, stored_at) VALUES (?, ?, ?, ?)",
+                (key[0], key[1], json.dumps(list(urls)), now),
+            )
+            self._db.commit()
+
+    def _remember(self, key, urls, stored_at):
+        self._memory.pop(key, None)
+        self._memory[key] = (urls, stored_at)
+        while len(self._memory) > self.max_memory:
+            self._memory.pop(next(iter(self._memory)))
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one execution."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """Runs fn() once per key at a time; concurrent callers get the same result."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+        return future.result()
+
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache():
+    """Returns the process-wide search cache, opening it on first use."""
+    global _search_cache
+    if _search_cache is None:
+        with _search_cache_lock:
+            if _search_cache is None:
+                _search_cache = SearchCache()
+    return _search_cache
@@ -1,39 +1,125 @@
+from typing import Callable, Optional
+
 from crewai import Task
+from pydantic import PrivateAttr
+from crewai.tasks.task_output import TaskOutput
 from agents import researcher, analyst, summarizer
+from compaction import COMPACTION_ENABLED, CONTEXT_TOKEN_BUDGET, compact_for_task
+from fanout import FANOUT_ENABLED, research_notes
+from metrics import span
+
+
+class TimedTask(Task):
+    """A Task whose execution is recorded as a "task" span labelled with its agent's role.
+
+    A callback set with ``set_done_callback`` receives the output once the task
+    finished. ``Task.callback`` cannot serve for this: ``Crew.kickoff``
+    overwrites every task's callback with the crew's ``task_callback``.
+    """
+
+    _on_done: Optional[Callable] = PrivateAttr(default=None)
+
+    def set_done_callback(self, on_done):
+        self._on_done = on_done
+
+    def execute(self, agent=None, context=None, tools=None):
+        with span("task", getattr(agent or self.agent, "role", "")):
+            result = super().execute(agent=agent, context=context, tools=tools)
+        if self._on_done is not None:
+            self._on_done(self.output)
+        return result
+
+
+class FanOutTask(TimedTask):
+    """The research task done by fanout.research_notes instead of the agent's chain of tool calls.
+
+    Its output is the condensed per-source notes, so that is all the later
+    tasks receive as context.
+    """
+
+    topic: Optional[str] = None
+
+    def interpolate_inputs(self, inputs):
+        super().interpolate_inputs(inputs)
+        self.topic = (inputs or {}).get("topic")
+
+    def _execute(self, agent, task, context, tools):
+        notes = research_notes(self.topic or self.description)
+        self.output = TaskOutput(description=self.description, exported_output=notes, raw_output=notes)
+        if self.callback:
+            self.callback(self.output)
+        return notes
+
+
+class CompactingTask(TimedTask):
+    """A task that compacts the output of earlier tasks before its agent reads it.
+
+    Reasoning traces and repeated content are removed and the rest is fitted
+    into ``context_token_budget``, keeping source URLs; see compaction.py.
+    """
+
+    name: str = ""
+    context_token_budget: int = CONTEXT_TOKEN_BUDGET
+
+    def _execute(self, agent, task, context, tools):
+        query = f"{getattr(agent, 'goal', '')} {self.description}"
+        if self.context:  # Compact the outputs one by one rather than crewAI's joined string
+            context = [task.output.raw_output for task in self.context if task.output]
+        context = compact_for_task(self.name, context, self.context_token_budget, query)
+        return super()._execute(agent, task, context, tools)
+
+
+def build_tasks(researcher, analyst, summarizer, fanout=FANOUT_ENABLED, compaction=COMPACTION_ENABLED):
+    """Creates fresh research, analyze and summarize tasks for the given agents.
+
+    With ``fanout`` the research step runs as a FanOutTask, and the summarizer
+    sees its source notes next to the analysis so it can cite them. With
+    ``compaction`` analyze and summarize get their context compacted.
+    """
+    def later_task(name, **fields):
+        return CompactingTask(name=name, **fields) if compaction else TimedTask(**fields)
+
+    research = (FanOutTask if fanout else TimedTask)(
+        description=(
+            "1. Conduct thorough web searches on {topic}.\n"
+            "2. Gather information from reliable sources.\n"
+            "3. Document key findings with sources.\n"
+            "4. Identify main themes and trends.\n"
+            "5. Note any conflicting information or debates in the field."
+        ),
+        expected_output="A detailed research document with findings and sources for each key point.",
+        agent=researcher
+    )
+
+    analyze = later_task(
+        "analyze",
+        description=(
+            "1. Review all research findings.\n"
+            "2. Identify patterns and relationships.\n"
+            "3. Evaluate the reliability of sources.\n"
+            "4. Compare and contrast different viewpoints.\n"
+            "5. Draw evidence-based conclusions."
+        ),
+        expected_output="An analytical report highlighting key insights, patterns, and supported conclusions.",
+        agent=analyst
+    )
+
+    summarize = later_task(
+        "summarize",
+        description=(
+            "1. Create a structured summary of all findings.\n"
+            "2. Highlight key conclusions and insights.\n"
+            "3. Include relevant citations and sources.\n"
+            "4. Organize information in a clear, logical manner.\n"
+            "5. Add recommendations for further research if applicable."
+        ),
+        expected_output="A comprehensive research summary in markdown format, including executive summary, key findings, methodology, and citations.",
+        agent=summarizer,
+        context=[research, analyze] if fanout else None
+    )
+
+    return research, analyze, summarize
+
 
 # Define tasks
-research = Task(
-    description=(
-        "1. Conduct thorough web searches on {topic}.\n"
-        "2. Gather information from reliable sources.\n"
-        "3. Document key findings with sources.\n"
-        "4. Identify main themes and trends.\n"
-        "5. Note any conflicting information or debates in the field."
-    ),
-    expected_output="A detailed research document with findings and sources for each key point.",
-    agent=researcher
-)
-
-analyze = Task(
-    description=(
-        "1. Review all research findings.\n"
-        "2. Identify patterns and relationships.\n"
-        "3. Evaluate the reliability of sources.\n"
-        "4. Compare and contrast different viewpoints.\n"
-        "5. Draw evidence-based conclusions."
-    ),
-    expected_output="An analytical report highlighting key insights, patterns, and supported conclusions.",
-    agent=analyst
-)
-
-summarize = Task(
-    description=(
-        "1. Create a structured summary of all findings.\n"
-        "2. Highlight key conclusions and insights.\n"
-        "3. Include relevant citations and sources.\n"
-        "4. Organize information in a clear, logical manner.\n"
-        "5. Add recommendations for further research if applicable."
-    ),
-    expected_output="A comprehensive research summary in markdown format, including executive summary, key findings, methodology, and citations.",
-    agent=summarizer
-)
+research, analyze, summarize = build_tasks(researcher, analyst, summarizer)
@@ -0,0 +1,19 @@
+# tests/conftest.py
+
+import os
+import runpy
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Ollama ignores the key, but the OpenAI client refuses to start without one
+os.environ.setdefault("OPENAI_API_KEY", "ollama")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+# Without a local config.py, run against the template's settings
+if not os.path.exists(os.path.join(ROOT, "config.py")):
+    config = types.ModuleType("config")
+    config.__dict__.update(runpy.run_path(os.path.join(ROOT, "config.template.py")))
+    sys.modules["config"] = config
@@ -0,0 +1,15 @@
+from compaction import compact_context, strip_reasoning
+
+
+def test_unclosed_think_block_stops_at_the_next_paragraph():
+    assert compact_context("<think>weighing sources\n\nAnalysis cites https://a.com") == "Analysis cites https://a.com"
+
+
+def test_unclosed_think_block_stays_inside_its_own_output():
+    compacted = compact_context(["<think>cut off mid-thought", "Research notes from https://b.com"])
+    assert "Research notes from https://b.com" in compacted
+
+
+def test_closed_and_headless_blocks_are_removed():
+    assert strip_reasoning("<think>a</think>Answer") == "Answer"
+    assert strip_reasoning("plan</think>\n1. first") == "1. first"
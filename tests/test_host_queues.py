@@ -0,0 +1,24 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from web_search import HostQueues
+
+
+def test_busy_host_waits_in_its_queue_not_on_a_worker():
+    release = threading.Event()
+    queues = HostQueues(ThreadPoolExecutor(max_workers=3), per_host=2)
+    slow = [queues.submit(f"https://slow.example/{i}", release.wait, 5) for i in range(6)]
+    fast = queues.submit("https://fast.example/", lambda: "done")
+
+    assert fast.result(timeout=2) == "done"
+    release.set()
+    assert all(future.result(timeout=5) for future in slow)
+
+
+def test_idle_hosts_are_forgotten():
+    queues = HostQueues(ThreadPoolExecutor(max_workers=2), per_host=1)
+    futures = [queues.submit(f"https://host{i}.example/", lambda: None) for i in range(20)]
+    for future in futures:
+        future.result(timeout=5)
+    queues._executor.shutdown(wait=True)
+    assert queues.hosts() == 0
@@ -0,0 +1,31 @@
+# tests/test_task_callbacks.py
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from crewai import Crew  # noqa: E402
+from langchain_core.language_models.fake_chat_models import FakeListChatModel  # noqa: E402
+
+import tasks  # noqa: E402
+from agents import build_agents  # noqa: E402
+from crew_factory import set_task_callbacks  # noqa: E402
+
+
+def _stub_llm():
+    return FakeListChatModel(responses=["Thought: I can answer directly\nFinal Answer: stub output"] * 10)
+
+
+@pytest.mark.parametrize("fanout", [False, True])
+def test_kickoff_reports_every_finished_task(monkeypatch, fanout):
+    monkeypatch.setattr(tasks, "research_notes", lambda topic: f"notes on {topic}")
+    crew_tasks = tasks.build_tasks(*build_agents(_stub_llm()), fanout=fanout, compaction=False)
+    finished = []
+    set_task_callbacks(crew_tasks, lambda name, output: finished.append((name, output.raw_output)))
+
+    # Crew.kickoff replaces every task.callback with the crew's task_callback, which is None here
+    crew = Crew(agents=[task.agent for task in crew_tasks], tasks=list(crew_tasks))
+    crew.kickoff(inputs={"topic": "tidal power"})
+
+    research_output = "notes on tidal power" if fanout else "stub output"
+    assert finished == [("research", research_output), ("analyze", "stub output"), ("summarize", "stub output")]
@@ -0,0 +1,88 @@
+# token_stream.py
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from metrics import observe_llm_call, record_span
+
+# Receiver of the tokens generated on the current thread, if anyone is listening
+_token_sink = contextvars.ContextVar("token_sink", default=None)
+
+
+class TokenStreamHandler(BaseCallbackHandler):
+    """Forwards streamed LLM tokens to the sink registered by the current run.
+
+    Attach it to a chat model built with ``streaming=True``. Crew tasks run on
+    the thread that called ``kickoff``, so the sink set by that run receives
+    exactly its own tokens even when several runs share a process.
+    """
+
+    def on_llm_new_token(self, token, **kwargs):
+        sink = _token_sink.get()
+        if sink is not None and token:
+            sink(token)
+
+
+class TokenRateHandler(BaseCallbackHandler):
+    """Records each LLM call as an "llm" span with its token count and tokens per second.
+
+    Tokens are counted as they stream in, and the rate is measured from the
+    first token on, so prompt processing does not dilute it. Calls answered by
+    the response cache stream nothing and are only marked as cached.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        with self._lock:
+            self._calls[run_id] = {"started_at": time.time(), "started": time.perf_counter(),
+                                   "first_token": None, "tokens": 0}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self.on_llm_start(serialized, [], run_id=run_id)
+
+    def on_llm_new_token(self, token, *, run_id=None, **kwargs):
+        with self._lock:
+            call = self._calls.get(run_id)
+            if call is not None:
+                if call["first_token"] is None:
+                    call["first_token"] = time.perf_counter()
+                call["tokens"] += 1
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, error=f"{type(error).__name__}: {error}")
+
+    def _finish(self, run_id, error=None):
+        with self._lock:
+            call = self._calls.pop(run_id, None)
+        if call is None:
+            return
+        now = time.perf_counter()
+        attrs = {"tokens": call["tokens"]}
+        if call["first_token"] is None:
+            attrs["cached"] = error is None
+        else:
+            attrs["timeToFirstToken"] = call["first_token"] - call["started"]
+            attrs["generationSeconds"] = now - call["first_token"]
+            observe_llm_call(self.model, call["tokens"], attrs["generationSeconds"])
+        record_span("llm", now - call["started"], self.model, error=error, started_at=call["started_at"], **attrs)
+
+
+@contextmanager
+def stream_tokens_to(sink):
+    """Sends every token generated inside the block to ``sink(token)``."""
+    handle = _token_sink.set(sink)
+    try:
+        yield
+    finally:
+        _token_sink.reset(handle)
@@ -1,57 +1,366 @@
 # web_search.py
 
 import requests
-import spacy
-import pdfplumber
+import contextvars
+import io
+import os
+import itertools
+import multiprocessing
 import time
-from textblob import TextBlob
-from bs4 import BeautifulSoup
-from duckduckgo_search import DDGS
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from langchain.tools import BaseTool
 from typing import Optional, Type
 from pydantic import BaseModel
+from page_cache import get_page_cache
+from domain_health import DomainUnavailable, get_domain_health
+from search_cache import SingleFlight, get_search_cache, normalize_query
+from run_store import current_run_store
+from lazy_imports import ddgs, pdfplumber, spacy_nlp, text_blob
+from html_extract import decode_html, extract_main_text
+from metrics import span
+from logger_config import logger, setup_worker_logging, worker_log_queue
 
-# Load SpaCy NLP model
-nlp = spacy.load("en_core_web_sm")
+
+def __getattr__(name):
+    # SpaCy and TextBlob are loaded on first access instead of at import time
+    if name == "nlp":
+        return spacy_nlp()
+    if name == "TextBlob":
+        return text_blob()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Concurrent fetch settings
+FETCH_MAX_WORKERS = 8      # Global limit on pages fetched at the same time
+FETCH_PER_HOST_LIMIT = 2   # Limit on simultaneous fetches against one host
+FETCH_DEADLINE = 25        # Seconds search_and_extract waits for pages overall
+
+# Shared by every caller so the global limit holds across agent tool calls
+_fetch_executor = ThreadPoolExecutor(max_workers=FETCH_MAX_WORKERS, thread_name_prefix="fetch")
+_fetch_flight = SingleFlight()  # Concurrent fetches of one URL, e.g. by topics of a batch, share one download
+
+# Approximate tokens of passages WebSearchTool hands back to the agent
+TOOL_TOKEN_BUDGET = 1500
+LOCAL_TOP_K = 12   # Passages a search pulls from the local document index
+
+# JSON search endpoint used instead of DuckDuckGo, e.g. the offline benchmark's stub
+SEARCH_BACKEND_URL = os.environ.get("URIEL_SEARCH_BACKEND_URL")
+
+# Search results from these sites (and their subdomains) are dropped
+BLOCKED_SITES = frozenset(["researchgate.net", "academia.edu", "sciencedirect.com"])
+_search_flight = SingleFlight()
+
+# PDF extraction settings
+PDF_MAX_BYTES = 25 * 1024 * 1024   # Larger downloads are abandoned
+PDF_MAX_PAGES = 50                 # Pages read from the start of a document
+PDF_MAX_CHARS = 100_000            # Extraction stops once this much text is collected
+PDF_PROCESS_WORKERS = 0            # Processes used to parse large PDFs; 0 parses in-thread
+PDF_PARALLEL_MIN_PAGES = 20        # Documents with fewer pages are never split across processes
+
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+# HTML extraction settings
+HTML_MAX_BYTES = 3 * 1024 * 1024   # HTML beyond this is cut off before parsing
+HTML_CONTENT_TYPES = ("html", "xml", "text/plain")
+HTML_PARSER_BACKEND = None         # "selectolax", "lxml" or "html.parser"; None picks the fastest installed
+
+# Pooled HTTP client settings
+HTTP_POOL_CONNECTIONS = 32            # Number of per-host connection pools kept alive
+HTTP_POOL_MAXSIZE = FETCH_MAX_WORKERS  # Connections kept per host pool
+HTTP_RETRIES = 2                      # Retries on 429 and 5xx; a failed connect is retried once, a read timeout never
+HTTP_BACKOFF_FACTOR = 0.5             # Sleeps 0.5s, 1s, ... between retries
+HTTP_MAX_RETRY_AFTER = 5              # Longest Retry-After in seconds honoured; the fetch deadline is 25s
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+HTTP_HEADERS = {'User-Agent': 'Mozilla/5.0'}
+
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def configure_http_client(pool_connections=None, pool_maxsize=None, retries=None, backoff_factor=None):
+    """Rebuilds the shared HTTP client with new pool and retry settings."""
+    global _http_client, HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_RETRIES, HTTP_BACKOFF_FACTOR
+    with _http_client_lock:
+        if pool_connections is not None:
+            HTTP_POOL_CONNECTIONS = pool_connections
+        if pool_maxsize is not None:
+            HTTP_POOL_MAXSIZE = pool_maxsize
+        if retries is not None:
+            HTTP_RETRIES = retries
+        if backoff_factor is not None:
+            HTTP_BACKOFF_FACTOR = backoff_factor
+        if _http_client is not None:
+            _http_client.close()
+        _http_client = _build_http_client()
+    return _http_client
+
+
+class _CappedRetry(Retry):
+    """Retry that waits at most HTTP_MAX_RETRY_AFTER seconds, whatever Retry-After a server asks for."""
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, HTTP_MAX_RETRY_AFTER)
+
+
+def _build_http_client():
+    # A server that accepted the connection but does not answer is not retried:
+    # each attempt would hold a fetch worker and a host slot for the full timeout
+    retry = _CappedRetry(
+        total=None,
+        connect=1,
+        read=False,  # Raise the read timeout as is, so callers still see a Timeout
+        status=HTTP_RETRIES,
+        other=0,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=HTTP_RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=retry)
+    session = requests.Session()
+    session.headers.update(HTTP_HEADERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_http_client():
+    """Returns the module-wide keep-alive session shared by all extractors.
+
+    The underlying urllib3 pools are thread-safe, so the fetch workers share
+    one session and reuse connections per host across agent tool calls.
+    """
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = _build_http_client()
+    return _http_client
+
+
+def _is_blocked(url):
+    """Checks the URL's host and each parent domain against the blocked-site set."""
+    host = (urlparse(url).hostname or "").lower()
+    while host:
+        if host in BLOCKED_SITES:
+            return True
+        _, _, host = host.partition(".")
+    return False
+
+
+def _search_and_store(query, key):
+    cache = get_search_cache()
+    urls = cache.get(key)  # Another caller may have stored it while we waited
+    if urls is None:
+        results = _search_backend(query, key[1]) if SEARCH_BACKEND_URL else _search_duckduckgo(query, key[1])
+        urls = [result["href"] for result in results if not _is_blocked(result["href"])]
+        # No results is often a rate limit rather than an answer, so the next caller searches again
+        if urls:
+            cache.put(key, urls)
+    return urls
+
+
+def _search_duckduckgo(query, max_results):
+    DDGS = ddgs()
+    with DDGS() as search:
+        return list(search.text(query, max_results=max_results))
+
+
+def _search_backend(query, max_results):
+    """Queries SEARCH_BACKEND_URL, which answers ?q=&max_results= with DuckDuckGo-style [{"href": ...}]."""
+    response = get_http_client().get(SEARCH_BACKEND_URL, params={"q": query, "max_results": max_results}, timeout=10)
+    response.raise_for_status()
+    return response.json()
 
 
 def get_search_results(query, num_results=10):
-    """Fetch search results from DuckDuckGo while avoiding blocked sites."""
-    blocked_sites = ["researchgate.net", "academia.edu", "sciencedirect.com"]
-    try:
-        with DDGS() as ddgs:
-            results = ddgs.text(query, max_results=num_results)
-            urls = [result["href"] for result in results if not any(site in result["href"] for site in blocked_sites)]
-        return urls
-    except Exception as e:
-        print(f"❌ Error retrieving search results: {e}")
-        return []
+    """Fetch search results from DuckDuckGo while avoiding blocked sites.
 
+    Results are cached per normalized query and result count, and concurrent
+    callers asking the same query share a single DuckDuckGo search.
+    """
+    with span("search", query=query) as attrs:
+        key = (normalize_query(query), num_results)
+        urls = get_search_cache().get(key)
+        if urls is not None:
+            attrs["cached"] = True
+            logger.debug(f"💾 Search cache hit: {query}")
+            return urls
 
-def extract_text_from_pdf(url):
-    """Extracts text from a PDF URL."""
+        try:
+            return list(_search_flight.do(key, lambda: _search_and_store(query, key)))
+        except Exception as e:
+            attrs["failed"] = str(e)
+            logger.error(f"❌ Error retrieving search results: {e}")
+            return []
+
+
+def _fetch_cached(url, timeout, parse):
+    """Returns parse(response) for a URL, served from or revalidated against the page cache.
+
+    Requests pass the domain health checks first: a URL that failed recently,
+    or one on a domain whose circuit is open, raises DomainUnavailable (or
+    returns its stale cached text) instead of waiting for a timeout. The
+    timeout itself is fitted to the domain's usual response time.
+    """
+    cache = get_page_cache()
+    cached = cache.lookup(url)
+    if cached is not None and cached.fresh:
+        logger.debug(f"💾 Page cache hit: {url}")
+        return cached.text
+
+    health = get_domain_health()
+    try:
+        health.check(url)
+    except DomainUnavailable:
+        if cached is None:
+            raise
+        logger.debug(f"💾 Serving stale page, its domain is unavailable: {url}")
+        return cached.text
+
+    headers = cached.conditional_headers() if cached is not None else {}
+    domain_timeout = health.timeout_for(url, timeout)
     try:
-        print(f"📄 Downloading PDF: {url}")
-        session = requests.Session()
-        session.headers.update({'User-Agent': 'Mozilla/5.0'})
+        with get_http_client().get(url, headers=headers, timeout=domain_timeout, stream=True) as response:
+            if response.status_code == 304 and cached is not None:
+                logger.debug(f"💾 Page not modified: {url}")
+                health.record_success(url, response.elapsed.total_seconds())
+                cache.mark_revalidated(url)
+                return cached.text
+
+            response.raise_for_status()
+            health.record_success(url, response.elapsed.total_seconds())
+            text = parse(response)
+    except requests.HTTPError as e:
+        health.record_failure(url, str(e), status=e.response.status_code)
+        raise
+    except requests.RequestException as e:
+        health.record_failure(url, type(e).__name__, timed_out=isinstance(e, requests.Timeout),
+                              timeout_narrowed=domain_timeout < timeout)
+        raise
+    except Exception:
+        health.release_probe(url)
+        raise
+    cache.store(url, text, etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified"))
+    return text
+
+
+def _read_capped(response, max_bytes, chunks=None):
+    """Streams a response body into memory, refusing bodies larger than max_bytes."""
+    length = response.headers.get("Content-Length")
+    if length and length.isdigit() and int(length) > max_bytes:
+        raise ValueError(f"body is {length} bytes, limit is {max_bytes}")
+
+    buffer = io.BytesIO()
+    for chunk in chunks if chunks is not None else response.iter_content(chunk_size=64 * 1024):
+        buffer.write(chunk)
+        if buffer.tell() > max_bytes:
+            raise ValueError(f"body exceeds {max_bytes} bytes")
+    buffer.seek(0)
+    return buffer
+
+
+def _extract_pdf_pages(source, page_numbers, max_chars=None):
+    """Extracts text from the given pages of a PDF, once per page, stopping at max_chars."""
+    texts, total = [], 0
+    with pdfplumber().open(io.BytesIO(source) if isinstance(source, bytes) else source) as pdf:
+        for number in page_numbers:
+            text = pdf.pages[number].extract_text()
+            if not text:
+                continue
+            texts.append(text)
+            total += len(text)
+            if max_chars is not None and total >= max_chars:
+                break
+    return texts
+
+
+def _get_pdf_pool():
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            # Spawned like the crew workers: forking would copy the fetch threads' locks mid-use
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=PDF_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=setup_worker_logging,
+                initargs=(worker_log_queue(),),
+            )
+    return _pdf_pool
+
+
+def _parse_pdf(response, chunks=None):
+    buffer = _read_capped(response, PDF_MAX_BYTES, chunks)
+    with span("parse", "pdf", bytes=buffer.getbuffer().nbytes) as attrs:
+        with pdfplumber().open(buffer) as pdf:
+            page_count = attrs["pages"] = min(len(pdf.pages), PDF_MAX_PAGES)
+
+        if PDF_PROCESS_WORKERS > 0 and page_count >= PDF_PARALLEL_MIN_PAGES:
+            # Each worker opens its own copy of the document and parses a slice of pages
+            data = buffer.getvalue()
+            step = -(-page_count // PDF_PROCESS_WORKERS)
+            slices = [range(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+            futures = [_get_pdf_pool().submit(_extract_pdf_pages, data, pages, PDF_MAX_CHARS) for pages in slices]
+            texts = [text for future in futures for text in future.result()]
+        else:
+            buffer.seek(0)
+            texts = _extract_pdf_pages(buffer, range(page_count), PDF_MAX_CHARS)
+
+    text = "\n".join(texts)[:PDF_MAX_CHARS]
+    return text if text else "No meaningful text found in PDF."
+
 
-        response = session.get(url, timeout=20)
-        response.raise_for_status()
+def _parse_html(response):
+    """Extracts main text from an HTML response read in bounded chunks.
 
-        with open("temp.pdf", "wb") as file:
-            file.write(response.content)
+    The Content-Type header and the first bytes are checked before parsing:
+    PDFs served from HTML-looking URLs go to the PDF extractor, other binary
+    bodies are rejected, and HTML beyond HTML_MAX_BYTES is cut off. The body
+    is decoded with the header's charset (see html_extract.decode_html).
+    """
+    content_type = response.headers.get("Content-Type", "").lower()
+    if "application/pdf" in content_type:
+        return _parse_pdf(response)
+    if content_type and not any(kind in content_type for kind in HTML_CONTENT_TYPES):
+        raise ValueError(f"unsupported content type: {content_type}")
 
-        with pdfplumber.open("temp.pdf") as pdf:
-            text = "\n".join([page.extract_text() for page in pdf.pages if page.extract_text()])
-        
-        return text if text else "No meaningful text found in PDF."
+    chunks = response.iter_content(chunk_size=64 * 1024)
+    head = next(chunks, b"")
+    if head.lstrip().startswith(b"%PDF-"):
+        return _parse_pdf(response, itertools.chain([head], chunks))
+    if b"\x00" in head[:1024]:
+        raise ValueError("binary body served as HTML")
+
+    body = bytearray(head)
+    for chunk in chunks:
+        body += chunk
+        if len(body) >= HTML_MAX_BYTES:
+            logger.warning(f"✂️ Truncating HTML at {HTML_MAX_BYTES} bytes: {response.url}")
+            break
+    with span("parse", "html", bytes=min(len(body), HTML_MAX_BYTES)):
+        html = decode_html(bytes(body[:HTML_MAX_BYTES]), content_type)
+        return extract_main_text(html, backend=HTML_PARSER_BACKEND)
+
+
+def extract_text_from_pdf(url):
+    """Extracts text from a PDF URL."""
+    try:
+        logger.info(f"📄 Downloading PDF: {url}")
+        with span("fetch", "pdf", url=url):
+            return _fetch_cached(url, timeout=20, parse=_parse_pdf)
+    except DomainUnavailable as e:
+        logger.info(f"⛔ Skipping PDF {url}: {e}")
+        return "Error retrieving PDF content."
     except Exception as e:
-        print(f"❌ Error extracting PDF content: {e}")
+        logger.error(f"❌ Error extracting PDF content: {e}")
         return "Error retrieving PDF content."
 
 
@@ -61,47 +370,254 @@ def extract_text_from_url(url):
         return extract_text_from_pdf(url)
 
     try:
-        print(f"🌍 Scraping URL: {url}")
-        response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        main_content = soup.find("article") or soup.find("div", class_="content") or soup.body
-        paragraphs = main_content.find_all("p") if main_content else []
-
-        text = " ".join([p.get_text(strip=True) for p in paragraphs if len(p.get_text(strip=True)) > 30])
-        return text if len(text) > 100 else "No meaningful text found."
+        logger.info(f"🌍 Scraping URL: {url}")
+        with span("fetch", "html", url=url):
+            return _fetch_cached(url, timeout=10, parse=_parse_html)
 
+    except DomainUnavailable as e:
+        logger.info(f"⛔ Skipping {url}: {e}")
+        return "Error retrieving content."
     except Exception as e:
-        print(f"❌ Error extracting from {url}: {e}")
+        logger.error(f"❌ Error extracting from {url}: {e}")
         return "Error retrieving content."
 
 
-def search_and_extract(topic, num_results=5):
-    """Performs a search and extracts meaningful text from the results."""
-    urls = get_search_results(topic, num_results)
-    extracted_data = []
+class HostQueues:
+    """Runs calls on an executor, at most ``per_host`` at a time for each host.
+
+    Calls for a host at its limit wait in that host's queue rather than on an
+    executor thread, so one slow host cannot hold every worker. A host is
+    forgotten once nothing for it is running or queued.
+    """
+
+    def __init__(self, executor, per_host):
+        self._executor = executor
+        self._per_host = per_host
+        self._lock = threading.Lock()
+        self._hosts = {}  # host -> [calls running, deque of queued (future, fn, args)]
+
+    def submit(self, url, fn, *args):
+        """Returns a Future for ``fn(*args)``, run once ``url``'s host has a free slot."""
+        host = urlparse(url).netloc.lower()
+        call = (Future(), fn, args)
+        with self._lock:
+            state = self._hosts.setdefault(host, [0, deque()])
+            start = state[0] < self._per_host
+            if start:
+                state[0] += 1
+            else:
+                state[1].append(call)
+        if start:
+            self._start(host, call)
+        return call[0]
+
+    def hosts(self):
+        """Returns the number of hosts with calls running or queued."""
+        with self._lock:
+            return len(self._hosts)
+
+    def _start(self, host, call):
+        future, fn, args = call
+
+        def run():
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args))
+                    except BaseException as e:
+                        future.set_exception(e)
+            finally:
+                self._finished(host)
+
+        self._executor.submit(run)
+
+    def _finished(self, host):
+        with self._lock:
+            state = self._hosts[host]
+            while state[1] and state[1][0][0].cancelled():  # Dropped by a caller past its deadline
+                state[1].popleft()
+            if not state[1]:
+                state[0] -= 1
+                if not state[0]:
+                    del self._hosts[host]
+                return
+            call = state[1].popleft()
+        self._start(host, call)
+
+
+_host_queues = HostQueues(_fetch_executor, FETCH_PER_HOST_LIMIT)
+
+
+def _fetch_once(url):
+    """Extracts text from a URL, unless the active run store got it meanwhile, and stores it right away.
+
+    A URL already being fetched by another caller is not fetched again; this
+    call waits for that fetch and returns its text.
+    """
+    return _fetch_flight.do(url, lambda: _fetch_and_store(url))
+
+
+def _fetch_and_store(url):
+    store = current_run_store()
+    text = store.get_page(url) if store is not None else None
+    if text is not None:
+        return text
+    text = extract_text_from_url(url)
+    if store is not None and _is_usable(text):
+        store.put_pages({url: text})
+    return text
+
 
+def fetch_all(urls, deadline=FETCH_DEADLINE):
+    """Fetches URLs concurrently and returns {url: text} for the pages finished before the deadline."""
+    # Each fetch runs in a copy of the caller's context so its spans join the caller's trace
+    futures = {
+        url: _host_queues.submit(url, contextvars.copy_context().run, _fetch_once, url)
+        for url in dict.fromkeys(urls)
+    }
+    done, pending = wait(futures.values(), timeout=deadline)
+
+    for future in pending:
+        future.cancel()
+    if pending:
+        logger.warning(f"⏱️ Fetch deadline reached, skipping {len(pending)} unfinished page(s)")
+
+    return {url: future.result() for url, future in futures.items() if future in done}
+
+
+def search_and_extract(topic, num_results=5, concurrent=True, deadline=FETCH_DEADLINE):
+    """Performs a search and extracts meaningful text from the results.
+
+    With ``concurrent`` the pages are fetched in parallel and only those finished
+    within ``deadline`` seconds are kept, still in the original ranking order.
+
+    Inside a research run, searches and pages already gathered by the run are
+    served from its RunStore and only new queries and URLs go to the network.
+
+    Near-duplicate pages (syndicated copies of one story) are collapsed into
+    the best-ranked copy, whose ``alternates`` list the other URLs. URLs that
+    earlier runs already identified as copies are only fetched if their
+    original did not come back usable, as a fallback for it.
+    """
+    from dedupe import collapse_near_duplicates, get_fingerprint_store, known_duplicates  # Loads NumPy
+    from doc_index import get_doc_index
+
+    store = current_run_store()
+    urls = store.get_search(topic, num_results) if store is not None else None
+    if urls is None:
+        urls = get_search_results(topic, num_results)
+        if store is not None and urls:
+            store.put_search(topic, num_results, urls)
+
+    fingerprints = get_fingerprint_store()
+    duplicates = known_duplicates(urls, fingerprints)
+
+    def fetch(missing, deadline):
+        if concurrent:
+            return fetch_all(missing, deadline=deadline)
+        return {url: extract_text_from_url(url) for url in missing}
+
+    started = time.monotonic()
+    texts = store.get_pages(urls) if store is not None else {}
+    fetched = fetch([url for url in urls if url not in texts and url not in duplicates], deadline)
+    texts.update(fetched)
+
+    # A known copy stands in for its original when the original could not be fetched
+    fallbacks = [url for url, original in duplicates.items() if not _is_usable(texts.get(original))]
+    for url in fallbacks:
+        del duplicates[url]
+    if duplicates:
+        logger.info(f"♊ Skipped {len(duplicates)} known duplicate page(s)")
+    missing = [url for url in fallbacks if url not in texts]
+    if missing:
+        logger.info(f"♊ Fetching {len(missing)} known duplicate page(s) in place of their failed original")
+        fetched.update(fetch(missing, max(0.0, deadline - (time.monotonic() - started))))
+        texts.update(fetched)
+
+    extracted_data = []
     for url in urls:
-        text = extract_text_from_url(url)
-        if "Error" in text or "No meaningful text" in text:
+        text = texts.get(url)
+        if not _is_usable(text):
             continue
         extracted_data.append({"url": url, "text": text})
 
+    if store is not None:
+        store.put_pages({item["url"]: item["text"] for item in extracted_data if item["url"] in fetched})
+    get_doc_index().add_documents([item for item in extracted_data if item["url"] in fetched])
+
+    extracted_data = collapse_near_duplicates(extracted_data, fingerprints)
+    by_url = {item["url"]: item for item in extracted_data}
+    for url, original in duplicates.items():
+        if original in by_url:
+            by_url[original]["alternates"].append(url)
     return extracted_data
 
 
+def search_local_first(query, num_results=5, use_local_index=True):
+    """Returns ``(results, source)`` for a query, answering from the local document index when it can.
+
+    Pages extracted in earlier runs, up to LOCAL_MAX_AGE ago, are searched
+    first; the web is only searched when they do not cover enough distinct
+    sources, or inside ``bypass_local_index()`` (refreshed runs). Local passages
+    of one page are joined into one result, so both sources give one result
+    per URL; ``source`` is ``"local"`` or ``"web"``.
+    """
+    from doc_index import LOCAL_MAX_AGE, get_doc_index, local_index_bypassed, sufficient_local_recall
+
+    index = get_doc_index() if use_local_index and not local_index_bypassed() else None
+    hits = index.search(query, k=LOCAL_TOP_K, max_age=LOCAL_MAX_AGE) if index is not None else []
+    if hits and sufficient_local_recall(hits, index.min_score):
+        logger.info(f"📚 Answering '{query}' from the local document index ({len(hits)} passages)")
+        passages = {}
+        for hit in hits:
+            if hit["score"] >= index.min_score:
+                passages.setdefault(hit["url"], []).append(hit["text"])
+        return [{"url": url, "text": "\n\n".join(texts)} for url, texts in passages.items()], "local"
+    return search_and_extract(query, num_results=num_results, concurrent=True), "web"
+
+
+def _is_usable(text):
+    """False for missing pages and the error or empty-page messages the extractors return."""
+    return text is not None and "Error" not in text and "No meaningful text" not in text
+
+
+def _cite(url, alternates):
+    """Formats a source URL together with the URLs of its duplicate copies."""
+    return f"{url} (also published at: {', '.join(alternates)})" if alternates else url
+
+
 class WebSearchTool(BaseTool):
     """CrewAI-compatible tool for web search and information extraction."""
     
     name = "Web Search"
     description = "Searches the web for relevant information and extracts meaningful content."
+    token_budget: int = TOOL_TOKEN_BUDGET
+    use_local_index: bool = True
     
     def _run(self, query: str) -> str:
-        """Runs a web search and extracts text from found sources."""
-        print(f"🔍 WebSearchTool received query: {query}")
-        results = search_and_extract(query, num_results=5)
-        return "\n\n".join([f"Source: {res['url']}\n{res['text']}" for res in results])
+        """Runs a web search and returns the passages most relevant to the query, with sources.
+
+        Pages extracted in earlier runs are searched first, see search_local_first.
+        """
+        from passage_rank import estimate_tokens, select_passages  # NumPy is only loaded once the tool is used
+
+        logger.info(f"🔍 WebSearchTool received query: {query}")
+        started = time.monotonic()
+        with span("tool", "web_search", query=query) as attrs:
+            results, attrs["source"] = search_local_first(query, num_results=5, use_local_index=self.use_local_index)
+            passages = select_passages(query, results, self.token_budget)
+            attrs["passages"] = len(passages)
+        alternates = {res["url"]: res.get("alternates", []) for res in results}
+        output = "\n\n".join([
+            f"Source: {_cite(passage['url'], alternates.get(passage['url']))}\n{passage['text']}" for passage in passages
+        ])
+
+        extracted_tokens = sum(estimate_tokens(res["text"]) for res in results)
+        logger.info(
+            f"📏 WebSearchTool: {len(passages)} passages from {len(results)} sources, "
+            f"~{estimate_tokens(output)} of ~{extracted_tokens} tokens, {time.monotonic() - started:.2f}s"
+        )
+        return output
 
     def _arun(self, query: str) -> str:
         """Async version fallback."""